@@ -0,0 +1,234 @@
+"""
+Benchmark the integration against a simulated IHC controller.
+
+Runs a minimal Home Assistant with the integration in a temporary config
+folder, against the local FakeIHCController. Measures the setup time (with
+and without cached project), the write throughput using util.async_set_bool
+and the latency from a resource change in the controller until the entity
+state is written. Run from the repository root:
+
+    python benchmarks/bench_controller.py --groups 50 --products 20
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from homeassistant import config_entries, core, loader
+from homeassistant.components.network import async_get_network
+from homeassistant.config import load_yaml_config_file
+from homeassistant.const import CONF_PASSWORD, CONF_URL, CONF_USERNAME
+from homeassistant.helpers import (
+    area_registry,
+    category_registry,
+    device_registry,
+    entity_registry,
+    floor_registry,
+    frame,
+    issue_registry,
+    label_registry,
+)
+from homeassistant.helpers.entity import Entity
+from homeassistant.setup import async_setup_component
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_discovery import AUTO_SETUP_PATH, make_project
+from fake_controller import SERIAL_NUMBER, FakeIHCController
+
+from custom_components.ihc import util
+from custom_components.ihc.auto_setup import AUTO_SETUP_SCHEMA
+from custom_components.ihc.const import (
+    CONF_AUTOSETUP,
+    CONF_WRITE_BURST,
+    CONF_WRITE_RATE,
+    DEFAULT_WRITE_BURST,
+    DEFAULT_WRITE_RATE,
+    DOMAIN,
+    IHC_CONTROLLER,
+    IHC_PLATFORMS,
+    IHC_PROFILER,
+)
+from custom_components.ihc.ihcdevice import IHCDevice
+
+INTEGRATION_PATH = Path(__file__).parent.parent / "custom_components" / DOMAIN
+
+
+async def async_start_hass(config_dir: Path) -> core.HomeAssistant:
+    """Start a minimal Home Assistant with the integration as custom component."""
+    (config_dir / ".storage").mkdir()
+    (config_dir / "custom_components").mkdir()
+    (config_dir / "custom_components" / DOMAIN).symlink_to(INTEGRATION_PATH)
+    hass = core.HomeAssistant(str(config_dir))
+    loader.async_setup(hass)
+    frame.async_setup(hass)
+    await asyncio.gather(
+        area_registry.async_load(hass),
+        category_registry.async_load(hass),
+        device_registry.async_load(hass),
+        entity_registry.async_load(hass),
+        floor_registry.async_load(hass),
+        issue_registry.async_load(hass),
+        label_registry.async_load(hass),
+    )
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await async_setup_component(hass, "homeassistant", {})
+    # The client session resolver needs the network adapters, without the
+    # http server dependencies of the network integration
+    await async_get_network(hass)
+    await hass.async_start()
+    return hass
+
+
+def create_entry(
+    url: str, options: dict[str, int] | None = None
+) -> config_entries.ConfigEntry:
+    """Create a config entry for the simulated controller."""
+    return config_entries.ConfigEntry(
+        data={
+            CONF_URL: url,
+            CONF_USERNAME: "benchmark",
+            CONF_PASSWORD: "benchmark",
+            CONF_AUTOSETUP: True,
+        },
+        discovery_keys={},
+        domain=DOMAIN,
+        minor_version=1,
+        options=options or {},
+        source=config_entries.SOURCE_USER,
+        subentries_data=None,
+        title="IHC Benchmark",
+        unique_id=SERIAL_NUMBER,
+        version=1,
+    )
+
+
+def get_setup_times(
+    hass: core.HomeAssistant, entry_id: str, start: float
+) -> dict[str, float]:
+    """Get the total setup time since start, and the time of each phase."""
+    profiler = hass.data[DOMAIN][entry_id][IHC_PROFILER]
+    return {"total": time.perf_counter() - start, **profiler.phases}
+
+
+async def async_bench_writes(
+    hass: core.HomeAssistant, entry_id: str, count: int
+) -> tuple[float, float]:
+    """Write bool values, return the concurrent and sequential writes/s."""
+    controller_data = hass.data[DOMAIN][entry_id]
+    ihc_controller = controller_data[IHC_CONTROLLER]
+    ihc_ids = [
+        resource.ihc_id
+        for platform in IHC_PLATFORMS
+        for resource in controller_data.get(platform, {}).values()
+    ][:count]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            util.async_set_bool(hass, ihc_controller, ihc_id, value=True)
+            for ihc_id in ihc_ids
+        )
+    )
+    concurrent = len(ihc_ids) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for ihc_id in ihc_ids:
+        await util.async_set_bool(hass, ihc_controller, ihc_id, value=False)
+    sequential = len(ihc_ids) / (time.perf_counter() - start)
+    return concurrent, sequential
+
+
+async def async_bench_notifications(
+    controller: FakeIHCController, duration: float
+) -> list[float]:
+    """Return the latencies from a controller change until the state is written."""
+    latencies = []
+
+    # The entities write the state after handling the change in on_ihc_change
+    def timed_write_ha_state(self: IHCDevice) -> None:
+        Entity.async_write_ha_state(self)
+        if self.ihc_id in controller.change_times:
+            latencies.append(time.monotonic() - controller.change_times[self.ihc_id])
+
+    IHCDevice.async_write_ha_state = timed_write_ha_state
+    controller.change_times.clear()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        del IHCDevice.async_write_ha_state
+    return latencies
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    auto_setup_conf = AUTO_SETUP_SCHEMA(load_yaml_config_file(str(AUTO_SETUP_PATH)))
+    project = make_project(auto_setup_conf, args.groups, args.products, args.resources)
+    controller = FakeIHCController(project, args.write_latency / 1000, args.notify_rate)
+    url = await controller.async_start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_hass(Path(config_dir))
+        entry = create_entry(
+            url, {CONF_WRITE_RATE: args.write_rate, CONF_WRITE_BURST: args.write_burst}
+        )
+        # The first setup downloads the project, the reload uses the cache
+        start = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        setups = {"download": get_setup_times(hass, entry.entry_id, start)}
+        start = time.perf_counter()
+        await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        setups["cached"] = get_setup_times(hass, entry.entry_id, start)
+        entities = len(hass.states.async_all())
+        concurrent, sequential = await async_bench_writes(
+            hass, entry.entry_id, args.writes
+        )
+        latencies = await async_bench_notifications(controller, args.duration)
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop()
+    await controller.async_stop()
+
+    print(f"{entities} entities, {args.groups * args.products} products")  # noqa: T201
+    for name, phases in setups.items():
+        times = ", ".join(
+            f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in phases.items()
+        )
+        print(f"setup ({name}): {times}")  # noqa: T201
+    print(  # noqa: T201
+        f"writes: {concurrent:.0f}/s concurrent, {sequential:.0f}/s sequential,"
+        f" {controller.requests.get('setResourceValues', 0)} requests"
+    )
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(  # noqa: T201
+            f"notifications: {len(latencies)}, latency p50 {quantiles[49] * 1000:.1f}ms"
+            f" p95 {quantiles[94] * 1000:.1f}ms max {max(latencies) * 1000:.1f}ms"
+        )
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--resources", type=int, default=2)
+    parser.add_argument("--write-latency", type=float, default=20, help="ms")
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument(
+        "--write-rate", type=int, default=DEFAULT_WRITE_RATE, help="requests/s"
+    )
+    parser.add_argument("--write-burst", type=int, default=DEFAULT_WRITE_BURST)
+    parser.add_argument("--notify-rate", type=float, default=50, help="changes/s")
+    parser.add_argument("--duration", type=float, default=5, help="seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(async_main(args))
+
+
+if __name__ == "__main__":
+    main()
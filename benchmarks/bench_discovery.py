@@ -0,0 +1,125 @@
+"""
+Benchmark the auto setup discovery on a synthetic IHC project.
+
+Measures the discovery on the parsed groups, and the incremental parse
+of the project together with the discovery, as done on setup.
+Run from the repository root:
+
+    python benchmarks/bench_discovery.py --groups 200 --products 20
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+from defusedxml import ElementTree
+from homeassistant.config import load_yaml_config_file
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from custom_components.ihc.auto_setup import (
+    AUTO_SETUP_SCHEMA,
+    get_discovery_info,
+    iter_project_groups,
+)
+from custom_components.ihc.const import (
+    AUTO_SETUP_YAML,
+    CONF_NODE,
+    CONF_XPATH,
+    IHC_PLATFORMS,
+)
+
+AUTO_SETUP_PATH = (
+    Path(__file__).parent.parent / "custom_components" / "ihc" / AUTO_SETUP_YAML
+)
+
+
+def make_project(
+    auto_setup_conf: dict, groups: int, products: int, resources: int
+) -> str:
+    """
+    Make a synthetic IHC project.
+
+    The products are picked from the auto setup rules, plus some products
+    not matching any rule.
+    """
+    rng = random.Random(1)  # noqa: S311
+    kinds = []
+    for platform in IHC_PLATFORMS:
+        for product_cfg in auto_setup_conf[platform]:
+            tag, _, identifier = product_cfg[CONF_XPATH][3:].partition("[")
+            identifier = identifier.partition('"')[2].partition('"')[0]
+            node = product_cfg[CONF_NODE].partition("[")[0]
+            kinds.append((tag, identifier, node))
+    kinds.append(("product_dataline", "_0xffff", "dataline_output"))
+    resource_id = 0x1000
+    lines = ['<?xml version="1.0" encoding="ISO-8859-1"?>', "<utcs_project><groups>"]
+    for group in range(groups):
+        lines.append(f'<group name="Group {group}" id="_0x{group:x}">')
+        for _ in range(products):
+            tag, identifier, node = rng.choice(kinds)
+            resource_id += 1
+            lines.append(
+                f'<{tag} product_identifier="{identifier}" id="_0x{resource_id:x}"'
+                f' name="Product {resource_id}" position="" note="">'
+            )
+            for _ in range(resources):
+                resource_id += 1
+                lines.append(f'<{node} id="_0x{resource_id:x}"/>')
+                resource_id += 1
+                lines.append(f'<setting_value id="_0x{resource_id:x}" setting="yes"/>')
+            lines.append(f"</{tag}>")
+        lines.append("</group>")
+    lines.append("</groups></utcs_project>")
+    return "\n".join(lines)
+
+
+def best_of(repeat: int, func: callable) -> float:
+    """Return the best time of a number of runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--resources", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    auto_setup_conf = AUTO_SETUP_SCHEMA(load_yaml_config_file(str(AUTO_SETUP_PATH)))
+    project = make_project(
+        auto_setup_conf, args.groups, args.products, args.resources
+    ).encode("ISO-8859-1")
+    groups = ElementTree.fromstring(project).findall(".//group")
+
+    discovery = get_discovery_info(auto_setup_conf, groups, "benchmark")
+    discovery_time = best_of(
+        args.repeat, lambda: get_discovery_info(auto_setup_conf, groups, "benchmark")
+    )
+    # The incremental parse discards the groups, so each run parses again
+    setup_time = best_of(
+        args.repeat,
+        lambda: get_discovery_info(
+            auto_setup_conf, iter_project_groups(io.BytesIO(project)), "benchmark"
+        ),
+    )
+    resources = sum(len(devices) for devices in discovery.values())
+    print(  # noqa: T201
+        f"{args.groups * args.products} products, {resources} resources\n"
+        f"discovery {discovery_time * 1000:.1f}ms,"
+        f" parse and discovery {setup_time * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
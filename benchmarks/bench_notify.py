@@ -0,0 +1,120 @@
+"""
+Benchmark the per notification overhead of the IHC entities.
+
+Sets up the integration against the simulated controller, and calls the
+notification handler of the binary sensor and switch entities directly,
+so the time is the entity update and state write only. The legacy run
+builds the state attributes on every access, as it was done before the
+dictionary was reused. Run from the repository root:
+
+    python benchmarks/bench_notify.py --groups 50 --products 20
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from homeassistant.config import load_yaml_config_file
+from homeassistant.const import Platform
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_controller import async_start_hass, create_entry
+from bench_discovery import AUTO_SETUP_PATH, make_project
+from fake_controller import FakeIHCController
+
+from custom_components.ihc.auto_setup import AUTO_SETUP_SCHEMA
+from custom_components.ihc.const import DOMAIN
+from custom_components.ihc.ihcdevice import IHCDevice
+
+
+def legacy_extra_state_attributes(self: IHCDevice) -> dict:
+    """Return the state attributes, built on each access."""
+    attributes = {
+        "ihc_id": self.ihc_id,
+        "ihc_name": self.ihc_name,
+        "ihc_note": self.ihc_note,
+        "ihc_position": self.ihc_position,
+    }
+    if len(self.hass.data[DOMAIN]) > 1:
+        attributes["ihc_controller"] = self.controller_id
+    return attributes
+
+
+def time_notifications(entities: list[IHCDevice], value: bool) -> float:  # noqa: FBT001
+    """Notify all entities of a value, return the time per notification."""
+    start = time.perf_counter()
+    for entity in entities:
+        entity._async_handle_ihc_change(entity.ihc_id, value)  # noqa: SLF001
+    return (time.perf_counter() - start) / len(entities)
+
+
+def time_legacy_notifications(entities: list[IHCDevice], value: bool) -> float:  # noqa: FBT001
+    """Notify all entities of a value, with the legacy attributes."""
+    IHCDevice.extra_state_attributes = property(legacy_extra_state_attributes)
+    try:
+        return time_notifications(entities, value)
+    finally:
+        del IHCDevice.extra_state_attributes
+
+
+def bench_notifications(entities: list[IHCDevice], rounds: int) -> tuple[float, float]:
+    """Return the best legacy and reused time per notification in seconds."""
+    legacy = []
+    reused = []
+    # The runs are interleaved, so both see the same warm up and noise
+    for round_number in range(rounds):
+        value = round_number % 2 == 0
+        legacy.append(time_legacy_notifications(entities, value))
+        reused.append(time_notifications(entities, not value))
+    return min(legacy), min(reused)
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the benchmark."""
+    auto_setup_conf = AUTO_SETUP_SCHEMA(load_yaml_config_file(str(AUTO_SETUP_PATH)))
+    project = make_project(auto_setup_conf, args.groups, args.products, args.resources)
+    controller = FakeIHCController(project)
+    url = await controller.async_start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_hass(Path(config_dir))
+        entry = create_entry(url)
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        entities = [
+            entity
+            for platform in async_get_platforms(hass, DOMAIN)
+            if platform.domain in (Platform.BINARY_SENSOR, Platform.SWITCH)
+            for entity in platform.entities.values()
+            if isinstance(entity, IHCDevice)
+        ]
+        legacy, reused = bench_notifications(entities, args.rounds)
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop()
+    await controller.async_stop()
+
+    print(  # noqa: T201
+        f"{len(entities)} entities, per notification: legacy {legacy * 1e6:.1f}us,"
+        f" reused {reused * 1e6:.1f}us, {legacy / reused:.2f}x"
+    )
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--resources", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(async_main(args))
+
+
+if __name__ == "__main__":
+    main()
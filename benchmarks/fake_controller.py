@@ -0,0 +1,226 @@
+"""
+A simulated IHC controller for the benchmarks.
+
+Implements the SOAP requests used by the integration and ihcsdk on a local
+aiohttp server. All resources are bool values. Writes can be given a
+latency, and the controller can change random resources at a given rate
+to emit notifications.
+"""
+
+import asyncio
+import base64
+import gzip
+import random
+import time
+from xml.etree.ElementTree import Element
+
+from aiohttp import web
+from defusedxml import ElementTree
+
+SERIAL_NUMBER = "BENCHMARK"
+PROJECT_SEGMENT_SIZE = 64 * 1024
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"'
+    ' xmlns:xsd="http://www.w3.org/2001/XMLSchema"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+    ' xmlns:ns1="utcs" xmlns:ns2="utcs.values">'
+    "<SOAP-ENV:Body>{body}</SOAP-ENV:Body></SOAP-ENV:Envelope>"
+)
+
+
+def local_name(element: Element) -> str:
+    """Get the tag of an element without the namespace."""
+    return element.tag.rpartition("}")[2]
+
+
+def resource_value(ihc_id: int, value: bool) -> str:  # noqa: FBT001
+    """Get the xml of a resource value."""
+    return (
+        '<ns1:arrayItem><ns1:value xsi:type="ns2:WSBooleanValue">'
+        f"<ns2:value>{'true' if value else 'false'}</ns2:value></ns1:value>"
+        f"<ns1:resourceID>{ihc_id}</ns1:resourceID></ns1:arrayItem>"
+    )
+
+
+class FakeIHCController:
+    """
+    Simulated IHC controller.
+
+    The time each resource value was changed is kept in change_times, to
+    measure the latency until the change is seen in Home Assistant.
+    """
+
+    def __init__(
+        self,
+        project: str,
+        write_latency: float = 0,
+        notify_rate: float = 0,
+    ) -> None:
+        """Initialize the controller with the project xml."""
+        data = gzip.compress(project.encode("ISO-8859-1"))
+        self.segments = [
+            data[index : index + PROJECT_SEGMENT_SIZE]
+            for index in range(0, len(data), PROJECT_SEGMENT_SIZE)
+        ]
+        self.write_latency = write_latency
+        self.notify_rate = notify_rate
+        self.values: dict[int, bool] = {}
+        self.change_times: dict[int, float] = {}
+        self.requests: dict[str, int] = {}
+        self.writes = 0
+        self._enabled: set[int] = set()
+        self._changes: dict[int, bool] = {}
+        self._changed = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self._notify_task: asyncio.Task | None = None
+        self.url = ""
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start the server, return the url of the controller."""
+        app = web.Application()
+        app.router.add_post("/ws/{service}", self._async_handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        self.url = f"http://{host}:{port}"
+        if self.notify_rate:
+            self._notify_task = asyncio.create_task(self._async_notify())
+        return self.url
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        if self._notify_task is not None:
+            self._notify_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def change(self, ihc_id: int, value: bool) -> None:  # noqa: FBT001
+        """Change a resource value, notify if it is enabled."""
+        self.values[ihc_id] = value
+        self.change_times[ihc_id] = time.monotonic()
+        if ihc_id in self._enabled:
+            self._changes[ihc_id] = value
+            self._changed.set()
+
+    async def _async_notify(self) -> None:
+        """Change random enabled resources at the notify rate."""
+        rng = random.Random(1)  # noqa: S311
+        while True:
+            await asyncio.sleep(1 / self.notify_rate)
+            if self._enabled:
+                ihc_id = rng.choice(sorted(self._enabled))
+                self.change(ihc_id, not self.values.get(ihc_id, False))
+
+    async def _async_handle(self, request: web.Request) -> web.Response:
+        """Handle a SOAP request."""
+        action = request.headers["SOAPAction"].strip('"')
+        self.requests[action] = self.requests.get(action, 0) + 1
+        xdoc = ElementTree.fromstring(await request.read())
+        body = next(element for element in xdoc if local_name(element) == "Body")
+        handler = getattr(self, f"_async_{action}", None)
+        if handler is None:
+            return web.Response(status=500)
+        result = await handler(list(body))
+        return web.Response(text=ENVELOPE.format(body=result), content_type="text/xml")
+
+    async def _async_authenticate(self, _payload: list[Element]) -> str:
+        return (
+            "<ns1:authenticate2><ns1:loginWasSuccessful>true"
+            "</ns1:loginWasSuccessful></ns1:authenticate2>"
+        )
+
+    async def _async_getSystemInfo(self, _payload: list[Element]) -> str:  # noqa: N802
+        return (
+            f"<ns1:getSystemInfo1><ns1:serialNumber>{SERIAL_NUMBER}</ns1:serialNumber>"
+            "<ns1:brand>Benchmark</ns1:brand><ns1:version>1.0</ns1:version>"
+            "<ns1:hwRevision>1</ns1:hwRevision></ns1:getSystemInfo1>"
+        )
+
+    async def _async_getState(self, _payload: list[Element]) -> str:  # noqa: N802
+        return (
+            "<ns1:getState1><ns1:state>text.ctrl.state.ready</ns1:state>"
+            "</ns1:getState1>"
+        )
+
+    async def _async_getProjectInfo(self, _payload: list[Element]) -> str:  # noqa: N802
+        return (
+            "<ns1:getProjectInfo1>"
+            '<ns1:projectMajorRevision xsi:type="xsd:int">1</ns1:projectMajorRevision>'
+            '<ns1:projectMinorRevision xsi:type="xsd:int">1</ns1:projectMinorRevision>'
+            "</ns1:getProjectInfo1>"
+        )
+
+    async def _async_getIHCProjectNumberOfSegments(  # noqa: N802
+        self, _payload: list[Element]
+    ) -> str:
+        return (
+            "<ns1:getIHCProjectNumberOfSegments1>"
+            f"{len(self.segments)}</ns1:getIHCProjectNumberOfSegments1>"
+        )
+
+    async def _async_getIHCProjectSegment(self, payload: list[Element]) -> str:  # noqa: N802
+        segment = self.segments[int(payload[0].text)]
+        return (
+            "<ns1:getIHCProjectSegment4><ns1:data>"
+            f"{base64.b64encode(segment).decode()}"
+            "</ns1:data></ns1:getIHCProjectSegment4>"
+        )
+
+    async def _async_setResourceValues(self, payload: list[Element]) -> str:  # noqa: N802
+        await self._async_write(list(payload[0]))
+        return "<ns1:setResourceValues2>true</ns1:setResourceValues2>"
+
+    async def _async_setResourceValue(self, payload: list[Element]) -> str:  # noqa: N802
+        await self._async_write([payload[0]])
+        return "<ns1:setResourceValue2>true</ns1:setResourceValue2>"
+
+    async def _async_write(self, items: list[Element]) -> None:
+        """Set the values of the items, after the write latency."""
+        if self.write_latency:
+            await asyncio.sleep(self.write_latency)
+        for item in items:
+            fields = {local_name(element): element for element in item}
+            value = fields["value"][0].text == "true"
+            self.change(int(fields["resourceID"].text), value)
+            self.writes += 1
+
+    async def _async_getResourceValues(self, payload: list[Element]) -> str:  # noqa: N802
+        ids = [int(item.text) for item in payload[0]]
+        values = "".join(
+            resource_value(ihc_id, self.values.get(ihc_id, False)) for ihc_id in ids
+        )
+        return f"<ns1:getRuntimeValues2>{values}</ns1:getRuntimeValues2>"
+
+    async def _async_enableRuntimeValueNotifications(  # noqa: N802
+        self, payload: list[Element]
+    ) -> str:
+        # Like the controller the current values are sent on the next poll
+        for item in payload[0]:
+            ihc_id = int(item.text)
+            self._enabled.add(ihc_id)
+            self._changes[ihc_id] = self.values.get(ihc_id, False)
+        self._changed.set()
+        return "<ns1:enableRuntimeValueNotifications2/>"
+
+    async def _async_waitForResourceValueChanges(  # noqa: N802
+        self, payload: list[Element]
+    ) -> str:
+        if not self._changes:
+            self._changed.clear()
+            try:
+                async with asyncio.timeout(int(payload[0].text)):
+                    await self._changed.wait()
+            except TimeoutError:
+                pass
+        changes, self._changes = self._changes, {}
+        values = "".join(
+            resource_value(ihc_id, value) for ihc_id, value in changes.items()
+        )
+        return (
+            f"<ns1:waitForResourceValueChanges2>{values}"
+            "</ns1:waitForResourceValueChanges2>"
+        )
@@ -1,27 +1,72 @@
 """Support for IHC devices."""
 
+import asyncio
 import logging
+import time
 
+import aiohttp
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_URL, CONF_USERNAME
+from homeassistant.const import CONF_PASSWORD, CONF_URL, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.loader import async_get_integration
 from ihcsdk.ihccontroller import IHCController
 
+from .aioclient import IHCAsyncClient, create_ssl_params
 from .auto_setup import autosetup_ihc_products
+from .batcher import IHCWriteBatcher
+from .cache import DiscoveryCache, ProjectCache
 from .const import (
     CONF_AUTOSETUP,
+    CONF_CONNECTION_LIMIT,
+    CONF_SKIP_UNCHANGED_WRITES,
+    CONF_WRITE_BATCH_WINDOW,
+    CONF_WRITE_BURST,
+    CONF_WRITE_RATE,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_SKIP_UNCHANGED_WRITES,
+    DEFAULT_WRITE_BATCH_WINDOW,
+    DEFAULT_WRITE_BURST,
+    DEFAULT_WRITE_RATE,
     DOMAIN,
+    IHC_CLIENT,
     IHC_CONTROLLER,
     IHC_CONTROLLER_ID,
+    IHC_DISCOVERY_CACHE,
+    IHC_FILTERS,
+    IHC_NOTIFIER,
     IHC_PLATFORMS,
+    IHC_PROFILER,
+    IHC_PROJECT_CACHE,
+    IHC_PULSE_ENGINE,
+    IHC_SETUP_TASK,
+    IHC_SUPERVISOR,
+    IHC_TRANSITION_ENGINE,
+    IHC_VALUE_CACHE,
+    IHC_WRITE_BATCHER,
+    SERVICE_PULSE,
 )
 from .manual_setup import MANUAL_SETUP_SCHEMA, manual_setup
+from .metrics import OPERATION_AUTHENTICATE
 from .migrate import migrate_configuration
+from .notify import IHCNotifier
+from .profiler import (
+    PHASE_AUTHENTICATE,
+    PHASE_INITIAL_VALUES,
+    PHASE_MANUAL_SETUP,
+    PHASE_PROJECT_AUTHENTICATE,
+    PHASE_SYSTEM_INFO,
+    StartupProfiler,
+)
+from .pulse import IHCPulseEngine
+from .ratelimit import AdaptiveRateLimiter
 from .service_functions import setup_service_functions
+from .supervisor import IHCConnectionSupervisor
+from .transition import IHCTransitionEngine
+from .valuecache import IHCValueCache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -60,42 +105,102 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     ihc_controller: IHCController = IHCController(url, username, password)
     #    ihc_controller.client.connection.min_interval = 0.1
     #    ihc_controller.client.connection.logtiming = True
-
-    if not await hass.async_add_executor_job(ihc_controller.authenticate):
-        _LOGGER.error("Unable to authenticate on IHC controller")
-        return False
+    # The asyncio client is used for everything but reading the project.
+    # The session has its own cookie jar for the controller login, and its
+    # own connector that pins the controller certificate like ihcsdk does
+    ssl_context, fingerprint = await hass.async_add_executor_job(create_ssl_params)
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(ssl=fingerprint),
+        cookie_jar=aiohttp.CookieJar(unsafe=True),
+    )
+    value_cache = IHCValueCache(
+        skip_unchanged_writes=entry.options.get(
+            CONF_SKIP_UNCHANGED_WRITES, DEFAULT_SKIP_UNCHANGED_WRITES
+        )
+    )
+    client = IHCAsyncClient(
+        session,
+        url,
+        username,
+        password,
+        entry.options.get(CONF_CONNECTION_LIMIT, DEFAULT_CONNECTION_LIMIT),
+        ssl_context,
+    )
+    batcher = IHCWriteBatcher(
+        hass,
+        client,
+        entry.options.get(CONF_WRITE_BATCH_WINDOW, DEFAULT_WRITE_BATCH_WINDOW) / 1000,
+        AdaptiveRateLimiter(
+            entry.options.get(CONF_WRITE_RATE, DEFAULT_WRITE_RATE),
+            entry.options.get(CONF_WRITE_BURST, DEFAULT_WRITE_BURST),
+        ),
+    )
+    supervisor = IHCConnectionSupervisor(hass, client, controller_id)
+    profiler = StartupProfiler(hass, controller_id)
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
+    hass.data[DOMAIN][entry.entry_id] = controller_data = {
+        IHC_PROFILER: profiler,
         IHC_CONTROLLER: ihc_controller,
         IHC_CONTROLLER_ID: controller_id,
+        IHC_CLIENT: client,
+        IHC_NOTIFIER: IHCNotifier(hass, client, value_cache, supervisor),
+        IHC_SUPERVISOR: supervisor,
+        IHC_VALUE_CACHE: value_cache,
+        IHC_PROJECT_CACHE: ProjectCache(hass, controller_id, client.metrics),
+        IHC_DISCOVERY_CACHE: DiscoveryCache(hass, controller_id),
+        IHC_FILTERS: {},
+        IHC_WRITE_BATCHER: batcher,
+        IHC_PULSE_ENGINE: IHCPulseEngine(hass, batcher),
+        IHC_TRANSITION_ENGINE: IHCTransitionEngine(hass, batcher),
     }
-    if not await setup_controller_device(hass, ihc_controller, entry):
+    # Reading the project overlaps with the login and device registration
+    results = await asyncio.gather(
+        async_setup_controller(hass, client, entry),
+        async_setup_products(hass, ihc_controller, entry, autosetup=autosetup),
+    )
+    if not all(results):
+        hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            hass.data.pop(DOMAIN)
+        await session.close()
         return False
-    if autosetup:
-        await hass.async_add_executor_job(
-            autosetup_ihc_products, hass, ihc_controller, entry
+    # Read the state of all resources before the entities are added
+    with profiler.phase(PHASE_INITIAL_VALUES):
+        await controller_data[IHC_NOTIFIER].async_fetch_values(
+            [
+                resource.ihc_id
+                for platform in IHC_PLATFORMS
+                for resource in controller_data.get(platform, {}).values()
+            ]
         )
-    await hass.async_add_executor_job(manual_setup, hass, entry)
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setups(entry, IHC_PLATFORMS)
+    controller_data[IHC_SETUP_TASK] = hass.async_create_task(
+        async_setup_platforms(hass, entry)
     )
-    entry.add_update_listener(async_update_options)
-    # We only wan to register service functions once, in case you have
-    # multiple controllers
-    if len(hass.data[DOMAIN]) == 1:
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    # We only want to register service functions once, in case you have
+    # multiple controllers. The controllers are set up concurrently.
+    if not hass.services.has_service(DOMAIN, SERVICE_PULSE):
         setup_service_functions(hass)
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
+    # The platforms must be set up before they can be unloaded
+    await hass.data[DOMAIN][entry.entry_id][IHC_SETUP_TASK]
     unload_ok = await hass.config_entries.async_unload_platforms(entry, IHC_PLATFORMS)
     if not unload_ok:
         return False
-    ihc_controller = hass.data[DOMAIN][entry.entry_id][IHC_CONTROLLER]
+    controller_data = hass.data[DOMAIN][entry.entry_id]
+    controller_data[IHC_NOTIFIER].async_stop()
+    controller_data[IHC_PULSE_ENGINE].async_shutdown()
+    controller_data[IHC_TRANSITION_ENGINE].async_shutdown()
+    controller_data[IHC_WRITE_BATCHER].async_shutdown()
+    await controller_data[IHC_CLIENT].session.close()
+    ihc_controller = controller_data[IHC_CONTROLLER]
     ihc_controller.disconnect()
     hass.data[DOMAIN].pop(entry.entry_id)
-    if hass.data[DOMAIN]:
+    if not hass.data[DOMAIN]:
         hass.data.pop(DOMAIN)
     return True
 
@@ -105,8 +210,82 @@ async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -
     await hass.config_entries.async_reload(config_entry.entry_id)
 
 
+async def async_setup_platforms(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Set up the platforms, and finish the startup profile."""
+    controller_data = hass.data[DOMAIN][entry.entry_id]
+    profiler: StartupProfiler = controller_data[IHC_PROFILER]
+
+    async def async_setup_platform(platform: Platform) -> None:
+        with profiler.phase(f"platform_{platform}"):
+            await hass.config_entries.async_forward_entry_setups(entry, [platform])
+
+    await asyncio.gather(
+        *(async_setup_platform(platform) for platform in IHC_PLATFORMS)
+    )
+    integration = await async_get_integration(hass, DOMAIN)
+    # The project cache meta data is only loaded (in the executor) by auto setup
+    project_version = (
+        controller_data[IHC_PROJECT_CACHE].version
+        if entry.data[CONF_AUTOSETUP]
+        else None
+    )
+    await profiler.async_finish(
+        integration_version=str(integration.version),
+        project_version=project_version,
+        products={
+            str(platform): len(controller_data.get(platform, {}))
+            for platform in IHC_PLATFORMS
+        },
+    )
+
+
+async def async_setup_controller(
+    hass: HomeAssistant, client: IHCAsyncClient, entry: ConfigEntry
+) -> bool:
+    """Login on the controller and register it as a device."""
+    profiler = hass.data[DOMAIN][entry.entry_id][IHC_PROFILER]
+    with profiler.phase(PHASE_AUTHENTICATE):
+        authenticated = await client.async_authenticate()
+    if not authenticated:
+        _LOGGER.error("Unable to authenticate on IHC controller")
+        return False
+    with profiler.phase(PHASE_SYSTEM_INFO):
+        return await setup_controller_device(hass, client, entry)
+
+
+async def async_setup_products(
+    hass: HomeAssistant,
+    ihc_controller: IHCController,
+    entry: ConfigEntry,
+    *,
+    autosetup: bool,
+) -> bool:
+    """Set up the IHC products from the project and the manual setup file."""
+    controller_data = hass.data[DOMAIN][entry.entry_id]
+    profiler = controller_data[IHC_PROFILER]
+    # ihcsdk is only used for reading the project for auto setup
+    if autosetup:
+        start = time.monotonic()
+        authenticated = await hass.async_add_executor_job(ihc_controller.authenticate)
+        profiler.add(PHASE_PROJECT_AUTHENTICATE, time.monotonic() - start)
+        metrics = controller_data[IHC_CLIENT].metrics
+        metrics.record(
+            OPERATION_AUTHENTICATE, time.monotonic() - start, success=authenticated
+        )
+        if not authenticated:
+            _LOGGER.error("Unable to authenticate on IHC controller")
+            return False
+        await hass.async_add_executor_job(
+            autosetup_ihc_products, hass, ihc_controller, entry
+        )
+    # The manual setup is done last, it can add to the auto setup products
+    with profiler.phase(PHASE_MANUAL_SETUP):
+        await hass.async_add_executor_job(manual_setup, hass, entry)
+    return True
+
+
 async def setup_controller_device(
-    hass: HomeAssistant, ihc_controller: IHCController, entry: ConfigEntry
+    hass: HomeAssistant, client: IHCAsyncClient, entry: ConfigEntry
 ) -> bool:
     """Register the IHC controller as a Home Assistant device."""
     # We must have a controller id, and cast the unique_id from string | None
@@ -115,22 +294,19 @@ async def setup_controller_device(
     if entry.unique_id is None:
         return False
     controller_id: str = entry.unique_id
-    system_info = await hass.async_add_executor_job(
-        ihc_controller.client.get_system_info
-    )
-    if not system_info or not isinstance(system_info, dict):
+    system_info = await client.async_get_system_info()
+    if not system_info:
         _LOGGER.error("Unable to get system information from IHC controller")
         return False
     device_registry = dr.async_get(hass)
-    model: str = (
-        f"{system_info.get('brand', '')} {system_info.get('hw_revision', '')}".strip()
-    )
+    brand = system_info.get("brand") or ""
+    model: str = f"{brand} {system_info.get('hw_revision') or ''}".strip()
     device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
         identifiers={(DOMAIN, controller_id)},
-        name=system_info.get("serial_number", controller_id),
+        name=system_info.get("serial_number") or controller_id,
         manufacturer="Schneider Electric",
         model=model,
-        sw_version=system_info.get("version", ""),
+        sw_version=system_info.get("version") or "",
     )
     return True
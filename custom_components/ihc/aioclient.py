@@ -0,0 +1,447 @@
+"""Asyncio SOAP client for the IHC controller."""
+
+import asyncio
+import datetime
+import hashlib
+import logging
+import ssl
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+from xml.etree.ElementTree import Element
+from xml.sax.saxutils import escape
+
+import aiohttp
+import ihcsdk
+from defusedxml import ElementTree
+
+from .const import (
+    DEFAULT_CONNECTION_LIMIT,
+    VALUE_TYPE_BOOL,
+    VALUE_TYPE_FLOAT,
+    VALUE_TYPE_INT,
+    VALUE_TYPE_TIME,
+    VALUE_TYPE_TIMER,
+)
+from .metrics import IHCMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+IHCNS = {
+    "SOAP-ENV": "http://schemas.xmlsoap.org/soap/envelope/",
+    "ns1": "utcs",
+    "ns2": "utcs.values",
+}
+XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+
+SOAP_ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"'
+    ' xmlns:xsd="http://www.w3.org/2001/XMLSchema"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+    "<s:Body>{body}</s:Body></s:Envelope>"
+)
+
+# Timeout for a request, the notification long polling adds the wait time
+REQUEST_TIMEOUT = 15
+
+# The controller certificate and the ciphers, the same as ihcsdk uses
+IHC_CERT_FILE = Path(ihcsdk.__file__).parent / "certs" / "ihc3.crt"
+IHC_CIPHERS = "DEFAULT:!DH"
+
+RESOURCE_VALUE = (
+    '<value xsi:type="ns1:{type}">{value}</value>'
+    "<typeString></typeString>"
+    "<resourceID>{id}</resourceID>"
+    "<isValueRuntime>true</isValueRuntime>"
+)
+
+
+def resource_value_xml(ihc_id: int, value_type: str, value: Any) -> str:
+    """Get the xml for setting a runtime value. The ns1 prefix is utcs.values."""
+    if value_type == VALUE_TYPE_BOOL:
+        wstype = "WSBooleanValue"
+        xml = f"<ns1:value>{'true' if value else 'false'}</ns1:value>"
+    elif value_type == VALUE_TYPE_INT:
+        wstype = "WSIntegerValue"
+        xml = f"<ns1:integer>{int(value)}</ns1:integer>"
+    elif value_type == VALUE_TYPE_FLOAT:
+        wstype = "WSFloatingPointValue"
+        xml = f"<ns1:floatingPointValue>{float(value)}</ns1:floatingPointValue>"
+    elif value_type == VALUE_TYPE_TIMER:
+        wstype = "WSTimerValue"
+        xml = f"<ns1:milliseconds>{int(value)}</ns1:milliseconds>"
+    elif value_type == VALUE_TYPE_TIME:
+        hours, minutes, seconds = value
+        wstype = "WSTimeValue"
+        xml = (
+            f"<ns1:hours>{int(hours)}</ns1:hours>"
+            f"<ns1:minutes>{int(minutes)}</ns1:minutes>"
+            f"<ns1:seconds>{int(seconds)}</ns1:seconds>"
+        )
+    else:
+        msg = f"Unknown IHC value type {value_type}"
+        raise ValueError(msg)
+    return RESOURCE_VALUE.format(type=wstype, value=xml, id=ihc_id)
+
+
+def create_ssl_params() -> tuple[ssl.SSLContext, aiohttp.Fingerprint]:
+    """
+    Create the ssl context and the certificate fingerprint for the controller.
+
+    Like ihcsdk the certificate is pinned by its fingerprint, and the DH
+    ciphers are excluded. This reads the certificate, so it must be called
+    in the executor.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    context.set_ciphers(IHC_CIPHERS)
+    certificate = ssl.PEM_cert_to_DER_cert(IHC_CERT_FILE.read_text())
+    return context, aiohttp.Fingerprint(hashlib.sha256(certificate).digest())
+
+
+def is_fault(xdoc: Element) -> bool:
+    """Return True if the response document is a SOAP fault."""
+    return xdoc.find("./SOAP-ENV:Body/SOAP-ENV:Fault", IHCNS) is not None
+
+
+def _find_int(element: Element, path: str) -> int:
+    """Get the integer value of a sub element."""
+    return int(element.find(path, IHCNS).text)
+
+
+def parse_resource_value(element: Element | None) -> Any:  # noqa: PLR0911
+    """
+    Get a runtime value from the xml, the same way as ihcsdk does.
+
+    Return None if there is no value, or it has a missing or unknown type.
+    """
+    if element is None:
+        return None
+    match element.get(XSI_TYPE, "").rpartition(":")[2]:
+        case "WSBooleanValue":
+            return element.find("./ns2:value", IHCNS).text == "true"
+        case "WSIntegerValue":
+            return _find_int(element, "./ns2:integer")
+        case "WSFloatingPointValue":
+            return round(float(element.find("./ns2:floatingPointValue", IHCNS).text), 2)
+        case "WSEnumValue":
+            return element.find("./ns2:enumName", IHCNS).text
+        case "WSTimerValue":
+            return _find_int(element, "./ns2:milliseconds")
+        case "WSTimeValue":
+            return datetime.time(
+                _find_int(element, "./ns2:hours"),
+                _find_int(element, "./ns2:minutes"),
+                _find_int(element, "./ns2:seconds"),
+            )
+        case "WSDate":
+            return datetime.datetime(  # noqa: DTZ001
+                _find_int(element, "./ns1:year"),
+                _find_int(element, "./ns1:monthWithJanuaryAsOne"),
+                _find_int(element, "./ns1:day"),
+                _find_int(element, "./ns1:hours"),
+                _find_int(element, "./ns1:minutes"),
+                _find_int(element, "./ns1:seconds"),
+            )
+        case "WSDateValue":
+            year = _find_int(element, "./ns2:year")
+            if year == 0:
+                year = datetime.datetime.now().year  # noqa: DTZ005
+            return datetime.datetime(  # noqa: DTZ001
+                year, _find_int(element, "./ns2:month"), _find_int(element, "./ns2:day")
+            )
+        case "int":
+            return int(element.text)
+    _LOGGER.debug("Ignoring IHC value of type %s", element.get(XSI_TYPE))
+    return None
+
+
+class IHCAsyncClient:
+    """
+    Asyncio SOAP client for the IHC controller.
+
+    Implements the requests used while running: authentication, system info,
+    runtime value reads and writes and the notification long polling. The
+    project is still read with ihcsdk in the executor, because it is only
+    read on setup and is cached.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        username: str,
+        password: str,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        ssl_context: ssl.SSLContext | None = None,
+    ) -> None:
+        """
+        Initialize the client. The session must have its own cookie jar.
+
+        The connection limit is the maximum number of concurrent requests to
+        the controller. The notification long polling is not counted, so it
+        does not block other requests. The ssl context is used for https
+        requests, the certificate fingerprint is checked by the connector of
+        the session, see create_ssl_params.
+        """
+        self.session = session
+        self._ssl: ssl.SSLContext | bool = True if ssl_context is None else ssl_context
+        self.url = url
+        self._username = username
+        self._password = password
+        self._auth_lock = asyncio.Lock()
+        self._request_limit = asyncio.Semaphore(connection_limit)
+        self.metrics = IHCMetrics()
+
+    async def async_soap_action(
+        self,
+        service: str,
+        action: str,
+        payload: str,
+        wait: float = 0,
+        *,
+        faults: bool = False,
+    ) -> Element | None:
+        """
+        Do a soap request, return the response document or None on error.
+
+        The wait is the extra seconds to allow for a long poll request.
+        With faults set, a SOAP fault returned with HTTP status 500 is
+        returned as the response document, so the caller can tell a rejected
+        request from a failed one.
+        The latency is recorded in the metrics, with the action as operation.
+        """
+        data = SOAP_ENVELOPE.format(body=payload).encode("utf-8")
+        if wait:
+            start = time.monotonic()
+            text = await self._async_post(service, action, data, wait, faults=faults)
+        else:
+            async with self._request_limit:
+                start = time.monotonic()
+                text = await self._async_post(
+                    service, action, data, wait, faults=faults
+                )
+        latency = time.monotonic() - start
+        xdoc = None
+        if text is not None:
+            try:
+                xdoc = ElementTree.fromstring(text)
+            except ElementTree.ParseError:
+                _LOGGER.debug("IHC %s returned invalid xml", action)
+        self.metrics.record(
+            action,
+            latency,
+            success=xdoc is not None and not is_fault(xdoc),
+        )
+        return xdoc
+
+    async def _async_post(
+        self, service: str, action: str, data: bytes, wait: float, *, faults: bool
+    ) -> str | None:
+        """Post the request, return the response text or None on error."""
+        headers = {
+            "Host": urlparse(self.url).netloc,
+            "Content-Type": "text/xml; charset=UTF-8",
+            "Cache-Control": "no-cache",
+            "SOAPAction": action,
+        }
+        try:
+            async with self.session.post(
+                self.url + service,
+                data=data,
+                headers=headers,
+                ssl=self._ssl,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT + wait),
+            ) as response:
+                if response.status == 500 and faults:  # noqa: PLR2004
+                    _LOGGER.debug("IHC %s returned a SOAP fault", action)
+                    return await response.text()
+                if response.status != 200:  # noqa: PLR2004
+                    _LOGGER.debug(
+                        "IHC %s failed with status %d", action, response.status
+                    )
+                    return None
+                return await response.text()
+        except (aiohttp.ClientError, TimeoutError) as exp:
+            _LOGGER.debug("IHC %s failed: %s", action, exp)
+            return None
+
+    async def async_authenticate(self) -> bool:
+        """Authenticate on the controller, the session cookie is kept."""
+        async with self._auth_lock:
+            payload = (
+                '<authenticate1 xmlns="utcs">'
+                f"<password>{escape(self._password)}</password>"
+                f"<username>{escape(self._username)}</username>"
+                "<application>treeview</application>"
+                "</authenticate1>"
+            )
+            xdoc = await self.async_soap_action(
+                "/ws/AuthenticationService", "authenticate", payload
+            )
+            if xdoc is None:
+                return False
+            result = xdoc.find(
+                "./SOAP-ENV:Body/ns1:authenticate2/ns1:loginWasSuccessful", IHCNS
+            )
+            return result is not None and result.text == "true"
+
+    async def async_get_system_info(self) -> dict[str, str | None] | None:
+        """Get the controller system info."""
+        xdoc = await self.async_soap_action(
+            "/ws/ConfigurationService", "getSystemInfo", ""
+        )
+        if xdoc is None:
+            return None
+        fields = {
+            "uptime": "uptime",
+            "serial_number": "serialNumber",
+            "brand": "brand",
+            "version": "version",
+            "hw_revision": "hwRevision",
+            "sw_date": "swDate",
+        }
+        system_info = {}
+        for key, param in fields.items():
+            element = xdoc.find(
+                f"./SOAP-ENV:Body/ns1:getSystemInfo1/ns1:{param}", IHCNS
+            )
+            system_info[key] = element.text if element is not None else None
+        return system_info
+
+    async def async_set_runtime_values(
+        self, writes: list[tuple[int, str, Any]]
+    ) -> list[bool]:
+        """
+        Set runtime values, (ihc_id, value_type, value), in a single request.
+
+        The values are applied in order. If the request fails we authenticate
+        and try again. A request the controller has answered is never sent
+        again, as it may have applied some of the values. If the controller
+        rejects the request with a SOAP fault, the values are set one by one,
+        so a single bad write does not fail the others. Return the result of
+        each write.
+        """
+        payload = (
+            '<setResourceValues1 xmlns="utcs" xmlns:ns1="utcs.values">'
+            + "".join(
+                f"<arrayItem>{resource_value_xml(*write)}</arrayItem>"
+                for write in writes
+            )
+            + "</setResourceValues1>"
+        )
+        result = await self._async_set_values("setResourceValues", payload)
+        if result is None and await self.async_authenticate():
+            result = await self._async_set_values("setResourceValues", payload)
+        if result is False and len(writes) > 1:
+            _LOGGER.debug(
+                "IHC rejected %d writes, setting them one by one", len(writes)
+            )
+            return [await self.async_set_runtime_value(*write) for write in writes]
+        return [bool(result)] * len(writes)
+
+    async def async_set_runtime_value(
+        self, ihc_id: int, value_type: str, value: Any
+    ) -> bool:
+        """Set a single runtime value."""
+        payload = (
+            '<setResourceValue1 xmlns="utcs" xmlns:ns1="utcs.values">'
+            + resource_value_xml(ihc_id, value_type, value)
+            + "</setResourceValue1>"
+        )
+        result = await self._async_set_values("setResourceValue", payload)
+        if result is None and await self.async_authenticate():
+            result = await self._async_set_values("setResourceValue", payload)
+        return bool(result)
+
+    async def _async_set_values(self, action: str, payload: str) -> bool | None:
+        """
+        Send a set value request, return None if the request failed.
+
+        Any reply without a SOAP fault is a success, unless it has a result
+        element that is not true. Like ihcsdk we do not depend on the shape
+        of the reply. A SOAP fault returns False.
+        """
+        xdoc = await self.async_soap_action(
+            "/ws/ResourceInteractionService", action, payload, faults=True
+        )
+        if xdoc is None:
+            return None
+        if is_fault(xdoc):
+            return False
+        result = xdoc.find(f"./SOAP-ENV:Body/ns1:{action}2", IHCNS)
+        return result is None or result.text == "true"
+
+    async def async_get_runtime_values(
+        self, ihc_ids: list[int]
+    ) -> dict[int, Any] | None:
+        """Get the runtime values of resources."""
+        payload = (
+            '<getRuntimeValues1 xmlns="utcs">'
+            + "".join(f"<arrayItem>{ihc_id}</arrayItem>" for ihc_id in ihc_ids)
+            + "</getRuntimeValues1>"
+        )
+        xdoc = await self.async_soap_action(
+            "/ws/ResourceInteractionService", "getResourceValues", payload
+        )
+        if xdoc is None:
+            return None
+        return dict(
+            self._parse_values(
+                xdoc, "./SOAP-ENV:Body/ns1:getRuntimeValues2/ns1:arrayItem"
+            )
+        )
+
+    async def async_enable_notifications(self, ihc_ids: list[int]) -> bool:
+        """Enable runtime value notifications for resources."""
+        payload = (
+            '<enableRuntimeValueNotifications1 xmlns="utcs"'
+            ' xmlns:a="http://www.w3.org/2001/XMLSchema">'
+            + "".join(f"<a:arrayItem>{ihc_id}</a:arrayItem>" for ihc_id in ihc_ids)
+            + "</enableRuntimeValueNotifications1>"
+        )
+        xdoc = await self.async_soap_action(
+            "/ws/ResourceInteractionService", "enableRuntimeValueNotifications", payload
+        )
+        return xdoc is not None
+
+    async def async_wait_for_changes(
+        self, wait: int = 10
+    ) -> list[tuple[int, Any]] | None:
+        """
+        Long poll for resource value changes.
+
+        Return all the changes since last poll as a list of (ihc_id, value),
+        or None if the request failed.
+        """
+        payload = (
+            '<waitForResourceValueChanges1 xmlns="utcs">'
+            f"{wait}</waitForResourceValueChanges1>"
+        )
+        xdoc = await self.async_soap_action(
+            "/ws/ResourceInteractionService",
+            "waitForResourceValueChanges",
+            payload,
+            wait=wait,
+        )
+        if xdoc is None:
+            return None
+        return self._parse_values(
+            xdoc, "./SOAP-ENV:Body/ns1:waitForResourceValueChanges2/ns1:arrayItem"
+        )
+
+    @staticmethod
+    def _parse_values(xdoc: Element, path: str) -> list[tuple[int, Any]]:
+        """Parse a list of resource values."""
+        values = []
+        for item in xdoc.findall(path, IHCNS):
+            ihc_id = item.find("ns1:resourceID", IHCNS)
+            if ihc_id is None:
+                continue
+            value = parse_resource_value(item.find("./ns1:value", IHCNS))
+            if value is not None:
+                values.append((int(ihc_id.text), value))
+        return values
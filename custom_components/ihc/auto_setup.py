@@ -1,7 +1,11 @@
 """Handle auto setup of IHC products from the ihc project file."""
 
 import logging
+import time
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import IO
+from xml.etree.ElementTree import Element
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
@@ -12,23 +16,37 @@ from homeassistant.const import CONF_TYPE, CONF_UNIT_OF_MEASUREMENT, UnitOfTempe
 from homeassistant.core import HomeAssistant
 from ihcsdk.ihccontroller import IHCController
 
+from .cache import get_discovery_key
 from .const import (
     AUTO_SETUP_YAML,
+    CONF_AVERAGE_WINDOW,
     CONF_BINARY_SENSOR,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
     CONF_DIMMABLE,
     CONF_INVERTING,
     CONF_LIGHT,
+    CONF_MIN_HOLD,
+    CONF_MIN_INTERVAL,
     CONF_NODE,
+    CONF_OFF_DELAY,
+    CONF_ON_DELAY,
     CONF_SENSOR,
     CONF_SWITCH,
     CONF_XPATH,
     DOMAIN,
+    IHC_DISCOVERY_CACHE,
     IHC_PLATFORMS,
+    IHC_PROFILER,
+    IHC_PROJECT_CACHE,
 )
+from .profiler import PHASE_DISCOVERY, PHASE_PROJECT_DOWNLOAD, PHASE_XML_PARSE
+from .resource import IHCResource
+from .sensorfilter import BINARY_SENSOR_FILTER_SCHEMA, SENSOR_FILTER_SCHEMA
 
 _LOGGER = logging.getLogger(__name__)
 
-
+# Rule xpaths that can be matched by tag and product identifier
 AUTO_SETUP_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_BINARY_SENSOR, default=[]): vol.All(
@@ -40,6 +58,7 @@ AUTO_SETUP_SCHEMA = vol.Schema(
                         vol.Required(CONF_XPATH): cv.string,
                         vol.Optional(CONF_INVERTING, default=False): cv.boolean,
                         vol.Optional(CONF_TYPE): cv.string,
+                        **BINARY_SENSOR_FILTER_SCHEMA,
                     }
                 )
             ],
@@ -66,6 +85,7 @@ AUTO_SETUP_SCHEMA = vol.Schema(
                         vol.Optional(
                             CONF_UNIT_OF_MEASUREMENT, default=UnitOfTemperature.CELSIUS
                         ): cv.string,
+                        **SENSOR_FILTER_SCHEMA,
                     }
                 )
             ],
@@ -89,11 +109,6 @@ def autosetup_ihc_products(
     hass: HomeAssistant, ihc_controller: IHCController, entry: ConfigEntry
 ) -> bool:
     """Auto setup of IHC products from the IHC project file."""
-    if not (project_xml := ihc_controller.get_project()):
-        _LOGGER.error("Unable to read project from IHC controller")
-        return False
-    project = ElementTree.fromstring(project_xml)
-
     # If an auto setup file exist in the configuration it will override
     yaml_path = hass.config.path(AUTO_SETUP_YAML)
     if not Path(yaml_path).is_file():
@@ -108,44 +123,121 @@ def autosetup_ihc_products(
         msg = "unique id not set"
         raise ValueError(msg)
     controller_id: str = entry.unique_id
-    groups = project.findall(".//group")
-    for platform in IHC_PLATFORMS:
-        platform_setup = auto_setup_conf[platform]
-        discovery_info = get_discovery_info(platform_setup, groups, controller_id)
-        if discovery_info:
-            hass.data[DOMAIN][entry.entry_id][platform] = discovery_info
+    controller_data = hass.data[DOMAIN][entry.entry_id]
+    project_cache = controller_data[IHC_PROJECT_CACHE]
+    discovery_cache = controller_data[IHC_DISCOVERY_CACHE]
+    profiler = controller_data[IHC_PROFILER]
+
+    with profiler.phase(PHASE_PROJECT_DOWNLOAD):
+        updated = project_cache.update(ihc_controller)
+    if not updated:
+        _LOGGER.error("Unable to read project from IHC controller")
+        return False
+    # If the project has not changed we do not need the project itself,
+    # the hash is enough to find the discovery data in the cache
+    discovery_key = get_discovery_key(project_cache.project_hash, auto_setup_conf)
+    if (discovery := discovery_cache.load(discovery_key)) is None:
+        start = time.monotonic()
+        with project_cache.open_project() as source:
+            groups = profiler.iter_timed(PHASE_XML_PARSE, iter_project_groups(source))
+            discovery = get_discovery_info(auto_setup_conf, groups, controller_id)
+        # Parsing is interleaved with the discovery, so subtract the parse time
+        profiler.add(
+            PHASE_DISCOVERY,
+            time.monotonic() - start - profiler.phases.get(PHASE_XML_PARSE, 0.0),
+        )
+        discovery_cache.save(discovery_key, discovery)
+    project_cache.release()
+    _LOGGER.debug(
+        "IHC project cache hits: %d, misses: %d. Discovery cache hits: %d, misses: %d",
+        project_cache.hits,
+        project_cache.misses,
+        discovery_cache.hits,
+        discovery_cache.misses,
+    )
+    controller_data.update(discovery)
     return True
 
 
-def get_discovery_info(platform_setup: dict, groups: list, controller_id: str) -> dict:
-    """Get discovery info for specified IHC platform."""
-    discovery_data = {}
+def iter_project_groups(source: IO[bytes]) -> Iterator[Element]:
+    """
+    Parse the project incrementally and yield the groups.
+
+    Each group is yielded when it has been parsed, and is discarded when
+    the outermost group it is part of has been processed. Elements outside
+    groups are discarded as soon as they have been parsed, so only a single
+    group is in memory at the time.
+    """
+    parents: list[Element] = []
+    group_depth = 0
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            if element.tag == "group":
+                group_depth += 1
+            continue
+        parents.pop()
+        if element.tag == "group":
+            yield element
+            group_depth -= 1
+        if group_depth == 0 and parents:
+            # Remove the element to keep the memory usage bounded
+            parents[-1].remove(element)
+
+
+def iter_project_nodes(
+    auto_setup_conf: dict, groups: Iterable[Element]
+) -> Iterator[tuple[str, dict, Element, Element, Element]]:
+    """
+    Find the IHC resources in the groups matching the auto setup rules.
+
+    Each group is matched against the rules of all platforms before the next
+    group is parsed. Yield (platform, product_cfg, group, product, node) for
+    each resource.
+    """
     for group in groups:
+        for platform in IHC_PLATFORMS:
+            for product_cfg in auto_setup_conf[platform]:
+                for product in group.findall(product_cfg[CONF_XPATH]):
+                    nodes = product.findall(product_cfg[CONF_NODE])
+                    for node in nodes:
+                        if "setting" in node.attrib and node.attrib["setting"] == "yes":
+                            continue
+                        yield platform, product_cfg, group, product, node
+
+
+def get_discovery_info(
+    auto_setup_conf: dict, groups: Iterable[Element], controller_id: str
+) -> dict[str, dict[str, IHCResource]]:
+    """Get discovery info for all IHC platforms."""
+    discovery: dict[str, dict[str, IHCResource]] = {}
+    for platform, product_cfg, group, product, node in iter_project_nodes(
+        auto_setup_conf, groups
+    ):
         groupname = group.attrib["name"]
-        for product_cfg in platform_setup:
-            products = group.findall(product_cfg[CONF_XPATH])
-            for product in products:
-                product_id = int(product.attrib["id"].strip("_"), 0)
-                nodes = product.findall(product_cfg[CONF_NODE])
-                for node in nodes:
-                    if "setting" in node.attrib and node.attrib["setting"] == "yes":
-                        continue
-                    ihc_id = int(node.attrib["id"].strip("_"), 0)
-                    name = f"{groupname}_{ihc_id}"
-                    # make the model number look a bit nicer - strip leading _
-                    model = product.get("product_identifier", "").lstrip("_")
-                    device = {
-                        "ihc_id": ihc_id,
-                        "ctrl_id": controller_id,
-                        "product": {
-                            "id": product_id,
-                            "name": product.get("name") or "",
-                            "note": product.get("note") or "",
-                            "position": product.get("position") or "",
-                            "model": model,
-                            "group": groupname,
-                        },
-                        "product_cfg": product_cfg,
-                    }
-                    discovery_data[name] = device
-    return discovery_data
+        ihc_id = int(node.attrib["id"].strip("_"), 0)
+        name = f"{groupname}_{ihc_id}"
+        # make the model number look a bit nicer - strip leading _
+        resource = IHCResource.create(
+            ihc_id=ihc_id,
+            controller_id=controller_id,
+            product_id=int(product.attrib["id"].strip("_"), 0),
+            name=product.get("name") or "",
+            note=product.get("note") or "",
+            position=product.get("position") or "",
+            model=product.get("product_identifier", "").lstrip("_"),
+            group=groupname,
+            sensor_type=product_cfg.get(CONF_TYPE),
+            inverting=product_cfg.get(CONF_INVERTING, False),
+            dimmable=product_cfg.get(CONF_DIMMABLE, False),
+            unit=product_cfg.get(CONF_UNIT_OF_MEASUREMENT),
+            deadband=product_cfg.get(CONF_DEADBAND),
+            deadband_percent=product_cfg.get(CONF_DEADBAND_PERCENT),
+            min_interval=product_cfg.get(CONF_MIN_INTERVAL),
+            average_window=product_cfg.get(CONF_AVERAGE_WINDOW),
+            on_delay=product_cfg.get(CONF_ON_DELAY),
+            off_delay=product_cfg.get(CONF_OFF_DELAY),
+            min_hold=product_cfg.get(CONF_MIN_HOLD),
+        )
+        discovery.setdefault(platform, {})[name] = resource
+    return discovery
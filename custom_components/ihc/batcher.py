@@ -0,0 +1,193 @@
+"""Batch runtime value writes to the IHC controller."""
+
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from ihcsdk.ihccontroller import IHCController
+
+from .aioclient import IHCAsyncClient
+from .const import (
+    VALUE_TYPE_BOOL,
+    VALUE_TYPE_FLOAT,
+    VALUE_TYPE_INT,
+    VALUE_TYPE_TIME,
+    VALUE_TYPE_TIMER,
+)
+from .ratelimit import AdaptiveRateLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+# A queued write: ihc_id, value_type, value and the future for the result
+_Write = tuple[int, str, Any, asyncio.Future[bool]]
+
+# Maximum number of writes in a single setResourceValues request
+BATCH_MAX_SIZE = 100
+
+# Write priorities. Entity commands go ahead of bulk writes from services
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+
+
+def set_runtime_value(
+    ihc_controller: IHCController, ihc_id: int, value_type: str, value: Any
+) -> bool:
+    """Set a single runtime value using the IHCController functions."""
+    if value_type == VALUE_TYPE_BOOL:
+        return ihc_controller.set_runtime_value_bool(ihc_id, value)
+    if value_type == VALUE_TYPE_INT:
+        return ihc_controller.set_runtime_value_int(ihc_id, value)
+    if value_type == VALUE_TYPE_FLOAT:
+        return ihc_controller.set_runtime_value_float(ihc_id, value)
+    if value_type == VALUE_TYPE_TIMER:
+        return ihc_controller.set_runtime_value_timer(ihc_id, value)
+    if value_type == VALUE_TYPE_TIME:
+        return ihc_controller.set_runtime_value_time(ihc_id, *value)
+    msg = f"Unknown IHC value type {value_type}"
+    raise ValueError(msg)
+
+
+class IHCWriteBatcher:
+    """
+    Collect runtime value writes to a controller and send them in batches.
+
+    Writes issued in the same event loop iteration, or within the batch
+    window, are sent as a single request. Only one request is in flight at
+    the time, and writes issued meanwhile are sent in the next batch.
+    Writes are queued in a lane per priority, and high priority writes are
+    sent first. The order of the writes is kept within a lane, and a high
+    priority write supersedes the queued lower priority writes to the same
+    resource, so an older bulk write cannot overwrite a newer command. The
+    superseded writes are not sent, and their result is False.
+    The requests are rate limited, and the rate is lowered if the controller
+    responds slowly.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: IHCAsyncClient,
+        window: float = 0,
+        limiter: AdaptiveRateLimiter | None = None,
+    ) -> None:
+        """Initialize the write batcher, with the default rate limits if none."""
+        self.hass = hass
+        self.client = client
+        self.window = window
+        self.limiter = AdaptiveRateLimiter() if limiter is None else limiter
+        self.batches = 0
+        self.writes = 0
+        # The highest number of queued writes seen
+        self.max_queue_length = 0
+        self._lanes: tuple[list[_Write], ...] = ([], [])
+        # The number of queued and in flight writes per resource
+        self._pending: dict[int, int] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def queue_length(self) -> int:
+        """Return the number of queued writes."""
+        return sum(len(lane) for lane in self._lanes)
+
+    @callback
+    def has_pending_write(self, ihc_id: int) -> bool:
+        """Return True if a write to the resource is queued or in flight."""
+        return ihc_id in self._pending
+
+    @callback
+    def async_write(
+        self,
+        ihc_id: int,
+        value_type: str,
+        value: Any,
+        priority: int = PRIORITY_HIGH,
+    ) -> asyncio.Future[bool]:
+        """Queue a runtime value write, the future has the result."""
+        future: asyncio.Future[bool] = self.hass.loop.create_future()
+        self._pending[ihc_id] = self._pending.get(ihc_id, 0) + 1
+        future.add_done_callback(partial(self._async_write_done, ihc_id))
+        for lane in self._lanes[priority + 1 :]:
+            self._supersede(lane, ihc_id)
+        self._lanes[priority].append((ihc_id, value_type, value, future))
+        self.max_queue_length = max(self.max_queue_length, self.queue_length)
+        if self._flush_task is None:
+            self._flush_task = self.hass.async_create_background_task(
+                self._async_flush(), "ihc write batch"
+            )
+        return future
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the queued writes, and the writes in flight."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        for lane in self._lanes:
+            for *_, future in lane:
+                future.cancel()
+            lane.clear()
+
+    @callback
+    def _async_write_done(self, ihc_id: int, _future: asyncio.Future[bool]) -> None:
+        """Count a write to a resource as done."""
+        if (count := self._pending[ihc_id] - 1) > 0:
+            self._pending[ihc_id] = count
+        else:
+            del self._pending[ihc_id]
+
+    @staticmethod
+    def _supersede(lane: list[_Write], ihc_id: int) -> None:
+        """Drop the queued writes to a resource, they are not written."""
+        if not any(write[0] == ihc_id for write in lane):
+            return
+        for write in lane:
+            if write[0] == ihc_id and not write[3].done():
+                write[3].set_result(False)
+        lane[:] = [write for write in lane if write[0] != ihc_id]
+
+    def _next_batch(self) -> list[_Write]:
+        """Take the next batch of writes, highest priority first."""
+        batch: list[_Write] = []
+        for lane in self._lanes:
+            count = BATCH_MAX_SIZE - len(batch)
+            batch.extend(lane[:count])
+            del lane[:count]
+        return batch
+
+    async def _async_flush(self) -> None:
+        """Send the queued writes until there are no more."""
+        try:
+            # Let the writes of this event loop iteration (or window) queue up
+            await asyncio.sleep(self.window)
+            while self.queue_length:
+                await self.limiter.async_acquire()
+                batch = self._next_batch()
+                writes = [
+                    (ihc_id, value_type, value)
+                    for ihc_id, value_type, value, _ in batch
+                ]
+                self.batches += 1
+                self.writes += len(writes)
+                start = time.monotonic()
+                try:
+                    results = await self.client.async_set_runtime_values(writes)
+                except asyncio.CancelledError:
+                    # Shut down, the batch is no longer in the lanes
+                    for *_, future in batch:
+                        future.cancel()
+                    raise
+                except Exception as exp:
+                    _LOGGER.exception("Error writing to the IHC controller")
+                    for *_, future in batch:
+                        if not future.done():
+                            future.set_exception(exp)
+                    continue
+                finally:
+                    self.limiter.record_response_time(time.monotonic() - start)
+                for (*_, future), result in zip(batch, results, strict=True):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._flush_task = None
@@ -8,11 +8,11 @@ from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
-from homeassistant.const import CONF_TYPE
 from homeassistant.util.enum import try_parse_enum
 
-from .const import CONF_INVERTING, DOMAIN, IHC_CONTROLLER
+from .const import DOMAIN, IHC_CONTROLLER
 from .ihcdevice import IHCDevice
+from .sensorfilter import BinarySensorFilter
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -20,31 +20,20 @@ if TYPE_CHECKING:
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from ihcsdk.ihccontroller import IHCController
 
+    from .resource import IHCResource
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Load IHC binary sensors based on a config entry."""
-    controller_id: str = str(entry.unique_id)
     controller_data = hass.data[DOMAIN][entry.entry_id]
     ihc_controller: IHCController = controller_data[IHC_CONTROLLER]
-    sensors = []
     if controller_data.get("binary_sensor"):
-        for name, device in controller_data["binary_sensor"].items():
-            ihc_id = device["ihc_id"]
-            product_cfg = device["product_cfg"]
-            product = device["product"]
-            sensor = IHCBinarySensor(
-                ihc_controller,
-                controller_id,
-                name,
-                ihc_id,
-                product_cfg.get(CONF_TYPE),
-                product_cfg[CONF_INVERTING],
-                product,
-            )
-            sensors.append(sensor)
-        async_add_entities(sensors)
+        async_add_entities(
+            IHCBinarySensor(ihc_controller, name, resource)
+            for name, resource in controller_data["binary_sensor"].items()
+        )
 
 
 class IHCBinarySensor(IHCDevice, BinarySensorEntity):
@@ -56,19 +45,15 @@ class IHCBinarySensor(IHCDevice, BinarySensorEntity):
     """
 
     def __init__(
-        self,
-        ihc_controller: IHCController,
-        controller_id: str,
-        name: str,
-        ihc_id: int,
-        sensor_type: str,
-        inverting: bool,
-        product=None,
+        self, ihc_controller: IHCController, name: str, resource: IHCResource
     ) -> None:
         """Initialize the IHC binary sensor."""
-        super().__init__(ihc_controller, controller_id, name, ihc_id, product)
-        self._attr_device_class = try_parse_enum(BinarySensorDeviceClass, sensor_type)
-        self.inverting = inverting
+        super().__init__(ihc_controller, name, resource)
+        self._attr_device_class = try_parse_enum(
+            BinarySensorDeviceClass, resource.sensor_type
+        )
+        self.inverting = resource.inverting
+        self.filter = BinarySensorFilter.from_resource(resource)
 
     def on_ihc_change(self, _ihc_id: int, value: Any) -> None:
         """IHC resource has changed."""
@@ -76,4 +61,3 @@ class IHCBinarySensor(IHCDevice, BinarySensorEntity):
             self._attr_is_on = not value
         else:
             self._attr_is_on = value
-        self.schedule_update_ha_state()
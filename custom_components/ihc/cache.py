@@ -0,0 +1,313 @@
+"""Persistent caches for data read from the IHC controller."""
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.json import save_json
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util.json import load_json_object
+from ihcsdk.ihcclient import IHCSTATE_READY, IHCSoapClient
+from ihcsdk.ihccontroller import IHCController
+
+from .metrics import OPERATION_GET_PROJECT, OPERATION_GET_PROJECT_INFO, IHCMetrics
+from .resource import IHCResource
+
+_LOGGER = logging.getLogger(__name__)
+
+# Change when the cached discovery data changes, to discard the old caches
+DISCOVERY_FORMAT = 3
+
+
+def get_discovery_key(project_hash: str, auto_setup_conf: dict[str, Any]) -> str:
+    """Get the discovery cache key for a project and auto setup configuration."""
+    conf = json.dumps(auto_setup_conf, sort_keys=True)
+    key = f"{DISCOVERY_FORMAT}\n{project_hash}\n{conf}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_project_version(
+    project_info: dict[str, Any] | Literal[False],
+) -> str | None:
+    """Get a version identifier from the controller project info."""
+    if not project_info or not isinstance(project_info, dict):
+        return None
+    major = project_info.get("projectMajorRevision")
+    minor = project_info.get("projectMinorRevision")
+    if major is None or minor is None:
+        return None
+    version = f"{major}.{minor}"
+    if (modified := project_info.get("lastmodified")) is not None:
+        version += f"-{modified}"
+    return version
+
+
+class ProjectCache:
+    """
+    On disk cache of the IHC project file.
+
+    The project is stored in the Home Assistant storage folder, keyed by the
+    controller serial number and the project revision reported by the
+    controller. Downloading the project is only done if the revision changed.
+    The project is read as a stream from the cache file, to avoid having the
+    whole project in memory. The number of cache hits and misses is kept with
+    the cache meta data.
+    All methods are blocking and must be run in the executor.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        controller_id: str,
+        metrics: IHCMetrics | None = None,
+    ) -> None:
+        """Initialize the project cache, the requests are recorded in metrics."""
+        storage = Path(hass.config.path(STORAGE_DIR))
+        self._metrics = metrics or IHCMetrics()
+        self._project_path = storage / f"ihc.{controller_id}.project.xml.gz"
+        self._meta_path = storage / f"ihc.{controller_id}.project.json"
+        self._meta: dict[str, Any] | None = None
+        self._unsaved_project: bytes | None = None
+
+    @property
+    def hits(self) -> int:
+        """Return the number of times the project was read from the cache."""
+        return self._get_meta().get("hits", 0)
+
+    @property
+    def misses(self) -> int:
+        """Return the number of times the project was downloaded."""
+        return self._get_meta().get("misses", 0)
+
+    @property
+    def version(self) -> str | None:
+        """Return the version of the cached project."""
+        return self._get_meta().get("version")
+
+    @property
+    def project_hash(self) -> str | None:
+        """Return the sha256 hash of the cached project."""
+        return self._get_meta().get("sha256")
+
+    def update(self, ihc_controller: IHCController) -> bool:
+        """
+        Make sure the cache has the current project of the controller.
+
+        The project is only downloaded if the revision has changed.
+        Return False if the project could not be read from the controller.
+        """
+        meta = self._get_meta()
+        client = ihc_controller.client
+        start = time.monotonic()
+        project_info = client.get_project_info()
+        self._metrics.record(
+            OPERATION_GET_PROJECT_INFO,
+            time.monotonic() - start,
+            success=bool(project_info),
+        )
+        version = get_project_version(project_info)
+        if (
+            version is not None
+            and version == meta.get("version")
+            and self._project_path.is_file()
+        ):
+            meta["hits"] = meta.get("hits", 0) + 1
+            self._save_meta()
+            _LOGGER.debug("Using cached IHC project version %s", version)
+            return True
+        _LOGGER.debug("Downloading IHC project version %s", version)
+        # We do not use ihc_controller.get_project because it will keep the
+        # project in memory
+        if client.get_state() != IHCSTATE_READY and (
+            client.wait_for_state_change(IHCSTATE_READY, 10) != IHCSTATE_READY
+        ):
+            return False
+        start = time.monotonic()
+        project_hash = self._download(client, project_info)
+        self._metrics.record(
+            OPERATION_GET_PROJECT,
+            time.monotonic() - start,
+            success=project_hash is not None,
+        )
+        if project_hash is None:
+            return False
+        meta["misses"] = meta.get("misses", 0) + 1
+        # Only a saved project with a known version can be used next time
+        meta["version"] = version if self._unsaved_project is None else None
+        meta["sha256"] = project_hash
+        self._save_meta()
+        return True
+
+    def _download(self, client: IHCSoapClient, project_info: Any) -> str | None:
+        """
+        Download the project segments into the cache file.
+
+        The segments are the gzip compressed project, and are written to the
+        file as they arrive. If the file cannot be written, the compressed
+        project is kept in memory until release is called.
+        Return the sha256 hash of the project, or None if the download failed.
+        """
+        self._unsaved_project = None
+        if not project_info:
+            return None
+        tmp_path = self._project_path.with_suffix(".tmp")
+        try:
+            with tmp_path.open("wb") as file:
+                project_hash = self._write_segments(client, project_info, file)
+            if project_hash is not None:
+                os.replace(tmp_path, self._project_path)  # noqa: PTH105
+                return project_hash
+        except OSError:
+            _LOGGER.warning("Unable to write IHC project cache %s", self._project_path)
+        else:
+            return None
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        buffer = io.BytesIO()
+        if (project_hash := self._write_segments(client, project_info, buffer)) is None:
+            return None
+        self._unsaved_project = buffer.getvalue()
+        return project_hash
+
+    @staticmethod
+    def _write_segments(
+        client: IHCSoapClient, project_info: dict[str, Any], target: IO[bytes]
+    ) -> str | None:
+        """
+        Write the compressed project segments to a file.
+
+        The segments are decompressed one at a time, only to check the project
+        and hash it. Return the sha256 hash of the project, or None on error.
+        """
+        major = project_info.get("projectMajorRevision", 0)
+        minor = project_info.get("projectMinorRevision", 0)
+        if (segments := client.get_project_number_of_segments()) is False:
+            return None
+        project_hash = hashlib.sha256()
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            for segment_number in range(segments):
+                segment = client.get_project_segment(segment_number, major, minor)
+                if segment is False:
+                    return None
+                target.write(segment)
+                project_hash.update(decompressor.decompress(segment))
+            project_hash.update(decompressor.flush())
+        except zlib.error:
+            _LOGGER.warning("The IHC project is not valid gzip data")
+            return None
+        if not decompressor.eof:
+            _LOGGER.warning("The IHC project is incomplete")
+            return None
+        return project_hash.hexdigest()
+
+    def open_project(self) -> IO[bytes]:
+        """
+        Open the project as a binary stream.
+
+        Call update before, to make sure the project is current.
+        """
+        if self._unsaved_project is not None:
+            return gzip.open(io.BytesIO(self._unsaved_project), "rb")
+        return gzip.open(self._project_path, "rb")
+
+    def release(self) -> None:
+        """Release the project kept in memory, when it is no longer needed."""
+        self._unsaved_project = None
+
+    def clear(self) -> None:
+        """Remove the cached project, forcing a download on next setup."""
+        self._get_meta()["version"] = None
+        self._save_meta()
+        self._project_path.unlink(missing_ok=True)
+
+    def _get_meta(self) -> dict[str, Any]:
+        """Get the cache meta data, loading it from disk the first time."""
+        if self._meta is None:
+            try:
+                self._meta = load_json_object(self._meta_path, default={})
+            except HomeAssistantError:
+                _LOGGER.warning("Invalid IHC project cache %s", self._meta_path)
+                self._meta = {}
+        return self._meta
+
+    def _save_meta(self) -> None:
+        """Save the cache meta data."""
+        try:
+            save_json(str(self._meta_path), self._get_meta())
+        except HomeAssistantError:
+            _LOGGER.warning("Unable to write IHC project cache %s", self._meta_path)
+
+
+class DiscoveryCache:
+    """
+    On disk cache of the auto setup discovery result.
+
+    The discovery data for all platforms is stored in the Home Assistant
+    storage folder with the key it was created for. See get_discovery_key.
+    All methods are blocking and must be run in the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, controller_id: str) -> None:
+        """Initialize the discovery cache for a controller."""
+        storage = Path(hass.config.path(STORAGE_DIR))
+        self._path = storage / f"ihc.{controller_id}.discovery.json"
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, key: str) -> dict[str, dict[str, IHCResource]] | None:
+        """Load the discovery data, return None if not cached for the key."""
+        try:
+            data = load_json_object(self._path, default={})
+        except HomeAssistantError:
+            _LOGGER.warning("Invalid IHC discovery cache %s", self._path)
+            data = {}
+        if data.get("key") != key or not isinstance(data.get("discovery"), dict):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {
+            platform: {
+                name: IHCResource.create(**resource)
+                for name, resource in resources.items()
+            }
+            for platform, resources in data["discovery"].items()
+        }
+
+    def save(self, key: str, discovery: dict[str, dict[str, IHCResource]]) -> None:
+        """Save the discovery data for the key."""
+        data = {
+            platform: {name: resource.as_dict() for name, resource in resources.items()}
+            for platform, resources in discovery.items()
+        }
+        try:
+            save_json(str(self._path), {"key": key, "discovery": data})
+        except HomeAssistantError:
+            _LOGGER.warning("Unable to write IHC discovery cache %s", self._path)
+
+    def get_state(self) -> dict[str, Any]:
+        """Return the counters and the cached key and resource counts."""
+        state: dict[str, Any] = {"hits": self.hits, "misses": self.misses}
+        try:
+            data = load_json_object(self._path, default={})
+        except HomeAssistantError:
+            data = {}
+        state["key"] = data.get("key")
+        if isinstance(discovery := data.get("discovery"), dict):
+            state["resources"] = {
+                platform: len(resources) for platform, resources in discovery.items()
+            }
+        return state
+
+    def clear(self) -> None:
+        """Remove the cached discovery data."""
+        self._path.unlink(missing_ok=True)
@@ -7,11 +7,26 @@ import voluptuous as vol
 from homeassistant import config_entries, exceptions
 from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.const import CONF_PASSWORD, CONF_URL, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import AbortFlow
 from ihcsdk.ihccontroller import IHCController
 
-from .const import CONF_AUTOSETUP, DOMAIN
+from .const import (
+    CONF_AUTOSETUP,
+    CONF_CONNECTION_LIMIT,
+    CONF_OPTIMISTIC,
+    CONF_SKIP_UNCHANGED_WRITES,
+    CONF_WRITE_BATCH_WINDOW,
+    CONF_WRITE_BURST,
+    CONF_WRITE_RATE,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_OPTIMISTIC,
+    DEFAULT_SKIP_UNCHANGED_WRITES,
+    DEFAULT_WRITE_BATCH_WINDOW,
+    DEFAULT_WRITE_BURST,
+    DEFAULT_WRITE_RATE,
+    DOMAIN,
+)
 from .util import get_controller_serial
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,6 +40,33 @@ DATA_SCHEMA = vol.Schema(
     }
 )
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        # Time in milliseconds to collect writes before sending them as a batch
+        vol.Optional(
+            CONF_WRITE_BATCH_WINDOW, default=DEFAULT_WRITE_BATCH_WINDOW
+        ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+        # Write requests per second, lowered while the controller responds slowly
+        vol.Optional(CONF_WRITE_RATE, default=DEFAULT_WRITE_RATE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+        # Write requests that can be sent at once, before the rate applies
+        vol.Optional(CONF_WRITE_BURST, default=DEFAULT_WRITE_BURST): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        # Maximum number of concurrent requests, not counting the long polling
+        vol.Optional(CONF_CONNECTION_LIMIT, default=DEFAULT_CONNECTION_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=10)
+        ),
+        # Skip writing values the controller has confirmed recently
+        vol.Optional(
+            CONF_SKIP_UNCHANGED_WRITES, default=DEFAULT_SKIP_UNCHANGED_WRITES
+        ): bool,
+        # Show the state of lights and switches before the controller confirms it
+        vol.Optional(CONF_OPTIMISTIC, default=DEFAULT_OPTIMISTIC): bool,
+    }
+)
+
 
 def do_validate(_hass: HomeAssistant, user_input: dict[str, Any]) -> str:
     """
@@ -53,6 +95,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        _config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -81,6 +131,23 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the IHC controller options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
+        )
+
+
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -4,33 +4,72 @@ from homeassistant.const import Platform
 
 ATTR_CONTROLLER_ID = "controller_id"
 ATTR_IHC_ID = "ihc_id"
+ATTR_PULSE_WIDTH = "pulse_width"
+ATTR_TYPE = "type"
 ATTR_VALUE = "value"
 ATTR_VALUE_HOUR = "value_hour"
 ATTR_VALUE_MINUTE = "value_minute"
 ATTR_VALUE_SECOND = "value_second"
+ATTR_VALUES = "values"
 
 AUTO_SETUP_YAML = "ihc_auto_setup.yaml"
 
 CONF_AUTOSETUP = "auto_setup"
+CONF_AVERAGE_WINDOW = "average_window"
 CONF_BINARY_SENSOR = "binary_sensor"
+CONF_CONNECTION_LIMIT = "connection_limit"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_PERCENT = "deadband_percent"
 CONF_DIMMABLE = "dimmable"
 CONF_INFO = "info"
 CONF_INVERTING = "inverting"
 CONF_LIGHT = "light"
+CONF_MIN_HOLD = "min_hold"
+CONF_MIN_INTERVAL = "min_interval"
 CONF_NODE = "node"
 CONF_NOTE = "note"
+CONF_OFF_DELAY = "off_delay"
 CONF_OFF_ID = "off_id"
+CONF_ON_DELAY = "on_delay"
 CONF_ON_ID = "on_id"
+CONF_OPTIMISTIC = "optimistic"
 CONF_POSITION = "position"
+CONF_PULSE_WIDTH = "pulse_width"
 CONF_SENSOR = "sensor"
+CONF_SKIP_UNCHANGED_WRITES = "skip_unchanged_writes"
 CONF_SWITCH = "switch"
+CONF_WRITE_BATCH_WINDOW = "write_batch_window"
+CONF_WRITE_BURST = "write_burst"
+CONF_WRITE_RATE = "write_rate"
 CONF_XPATH = "xpath"
 
+DEFAULT_CONNECTION_LIMIT = 4
+DEFAULT_OPTIMISTIC = False
+# Seconds a pulse is on
+DEFAULT_PULSE_WIDTH = 0.1
+DEFAULT_SKIP_UNCHANGED_WRITES = False
+DEFAULT_WRITE_BATCH_WINDOW = 0
+# Write requests per second, and the burst allowed when the controller is fast
+DEFAULT_WRITE_BURST = 5
+DEFAULT_WRITE_RATE = 10
+
 DOMAIN = "ihc"
 
+IHC_CLIENT = "client"
 IHC_CONTROLLER = "controller"
 IHC_CONTROLLER_ID = "controller_id"
 IHC_CONTROLLER_INDEX = "controller_index"
+IHC_DISCOVERY_CACHE = "discovery_cache"
+IHC_FILTERS = "filters"
+IHC_NOTIFIER = "notifier"
+IHC_PROFILER = "profiler"
+IHC_PROJECT_CACHE = "project_cache"
+IHC_PULSE_ENGINE = "pulse_engine"
+IHC_SETUP_TASK = "setup_task"
+IHC_SUPERVISOR = "supervisor"
+IHC_TRANSITION_ENGINE = "transition_engine"
+IHC_VALUE_CACHE = "value_cache"
+IHC_WRITE_BATCHER = "write_batcher"
 IHC_PLATFORMS = (
     Platform.BINARY_SENSOR,
     Platform.LIGHT,
@@ -40,9 +79,27 @@ IHC_PLATFORMS = (
 
 MANUAL_SETUP_YAML = "ihc_manual_setup.yaml"
 
+# Seconds to wait for the controller to confirm an optimistic state
+OPTIMISTIC_TIMEOUT = 5
+
+# Sent when a controller is lost or reconnected, formatted with the controller id
+SIGNAL_AVAILABILITY = "ihc_availability_{}"
+
+# Seconds between the levels written by a light transition
+TRANSITION_STEP_INTERVAL = 0.25
+
+SERVICE_GET_RUNTIME_VALUE = "get_runtime_value"
 SERVICE_SET_RUNTIME_VALUE_BOOL = "set_runtime_value_bool"
 SERVICE_SET_RUNTIME_VALUE_FLOAT = "set_runtime_value_float"
 SERVICE_SET_RUNTIME_VALUE_INT = "set_runtime_value_int"
 SERVICE_SET_RUNTIME_VALUE_TIMER = "set_runtime_value_timer"
 SERVICE_SET_RUNTIME_VALUE_TIME = "set_runtime_value_time"
+SERVICE_SET_RUNTIME_VALUES = "set_runtime_values"
 SERVICE_PULSE = "pulse"
+SERVICE_REFRESH_PROJECT = "refresh_project"
+
+VALUE_TYPE_BOOL = "bool"
+VALUE_TYPE_FLOAT = "float"
+VALUE_TYPE_INT = "int"
+VALUE_TYPE_TIME = "time"
+VALUE_TYPE_TIMER = "timer"
@@ -0,0 +1,121 @@
+"""Diagnostics support for IHC."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+
+from .const import (
+    DOMAIN,
+    IHC_CLIENT,
+    IHC_DISCOVERY_CACHE,
+    IHC_FILTERS,
+    IHC_NOTIFIER,
+    IHC_PLATFORMS,
+    IHC_PROFILER,
+    IHC_PROJECT_CACHE,
+    IHC_PULSE_ENGINE,
+    IHC_SUPERVISOR,
+    IHC_TRANSITION_ENGINE,
+    IHC_VALUE_CACHE,
+    IHC_WRITE_BATCHER,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+    from .cache import ProjectCache
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """
+    Return diagnostics for a config entry.
+
+    A snapshot of the setup, caches, queues and connection of the controller,
+    to attach when a site is slow.
+    """
+    controller_data = hass.data[DOMAIN][entry.entry_id]
+    notifier = controller_data[IHC_NOTIFIER]
+    batcher = controller_data[IHC_WRITE_BATCHER]
+    supervisor = controller_data[IHC_SUPERVISOR]
+    profiler = controller_data[IHC_PROFILER]
+    value_cache = controller_data[IHC_VALUE_CACHE]
+    pulse_engine = controller_data[IHC_PULSE_ENGINE]
+    transition_engine = controller_data[IHC_TRANSITION_ENGINE]
+    # The caches read their state from files
+    discovery_cache = await hass.async_add_executor_job(
+        controller_data[IHC_DISCOVERY_CACHE].get_state
+    )
+    project_cache = await hass.async_add_executor_job(
+        _get_project_cache_state, controller_data[IHC_PROJECT_CACHE]
+    )
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "resources": {
+            str(platform): len(controller_data.get(platform, {}))
+            for platform in IHC_PLATFORMS
+        },
+        "project_cache": project_cache,
+        "discovery_cache": discovery_cache,
+        "notifications": {
+            "registrations": notifier.registrations,
+            "callbacks": notifier.callbacks,
+            "initial_values": notifier.initial_values,
+            "initial_values_time": notifier.initial_values_time,
+        },
+        "filters": {
+            entity_id: {
+                "type": type(value_filter).__name__,
+                "suppressed": value_filter.suppressed,
+                "delayed": value_filter.delayed,
+                "pending": value_filter.pending,
+            }
+            for entity_id, value_filter in controller_data[IHC_FILTERS].items()
+        },
+        "value_cache": {
+            "values": len(value_cache),
+            "skipped_writes": value_cache.skipped_writes,
+        },
+        "writes": {
+            "queue_length": batcher.queue_length,
+            "max_queue_length": batcher.max_queue_length,
+            "batches": batcher.batches,
+            "writes": batcher.writes,
+            "rate": batcher.limiter.rate,
+            "rate_limit_waits": batcher.limiter.waits,
+            "rate_limit_wait_time": batcher.limiter.wait_time,
+            "pulses": pulse_engine.pulses,
+            "merged_pulses": pulse_engine.merged,
+            "transitions": transition_engine.transitions,
+            "transition_steps": transition_engine.steps,
+        },
+        "connection": {
+            "available": supervisor.available,
+            "reconnects": supervisor.reconnects,
+            "downtime": supervisor.downtime,
+            "history": list(supervisor.history),
+        },
+        "startup": {
+            "total": profiler.total,
+            "phases": profiler.phases,
+            "info": profiler.info,
+            "history": await profiler.async_get_history(),
+        },
+        "latency": controller_data[IHC_CLIENT].metrics.as_dict(),
+    }
+
+
+def _get_project_cache_state(project_cache: ProjectCache) -> dict[str, Any]:
+    """Return the state of the project cache."""
+    return {
+        "version": project_cache.version,
+        "hits": project_cache.hits,
+        "misses": project_cache.misses,
+    }
@@ -1,12 +1,34 @@
 """Implementation of a base class for all IHC devices."""
 
 import logging
-from typing import Any
+import time
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
 from ihcsdk.ihccontroller import IHCController
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    IHC_CLIENT,
+    IHC_FILTERS,
+    IHC_NOTIFIER,
+    IHC_SUPERVISOR,
+    OPTIMISTIC_TIMEOUT,
+)
+from .metrics import OPERATION_CONFIRM
+from .resource import IHCResource
+from .util import async_get_controller_data
+
+if TYPE_CHECKING:
+    from .metrics import IHCMetrics
+    from .sensorfilter import ValueFilter
+    from .supervisor import IHCConnectionSupervisor
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,7 +39,9 @@ class IHCDevice(Entity):
 
     All IHC devices have an associated IHC resource. IHCDevice handled the
     registration of the IHC controller callback when the IHC resource changes.
-    Derived classes must implement the on_ihc_change method
+    Derived classes must implement the on_ihc_change method, it should only
+    update the entity attributes. The state is written once by IHCDevice.
+    Derived classes can set a filter that drops or holds back notified values.
     """
 
     _attr_should_poll = False
@@ -25,49 +49,210 @@ class IHCDevice(Entity):
     def __init__(
         self,
         ihc_controller: IHCController,
-        controller_id: str,
         name: str,
-        ihc_id: int,
-        product: dict | None = None,
+        resource: IHCResource,
     ) -> None:
         """Initialize IHC attributes."""
         self.ihc_controller = ihc_controller
         self._name = name
-        self.ihc_id = ihc_id
-        self.controller_id = controller_id
+        self.resource = resource
+        self.ihc_id = resource.ihc_id
+        self.controller_id = resource.controller_id
+        self.ihc_name = resource.name
+        self.ihc_note = resource.note
+        self.ihc_position = resource.position
+        self.suggested_area = resource.group
         self.device_id = None
-        self.suggested_area = None
-        if product:
-            self.ihc_name = product["name"]
-            self.ihc_note = product["note"]
-            self.ihc_position = product["position"]
-            self.suggested_area = product.get("group", None)
-            if "id" in product:
-                product_id = product["id"]
-                self.device_id = f"{controller_id}_{product_id}"
-                # this will name the device the same way as the IHC visual application
-                # Product name + position
-                self.device_name = product["name"]
-                if self.ihc_position:
-                    self.device_name += f" ({self.ihc_position})"
-                self.device_model = product["model"]
-        else:
-            self.ihc_name = ""
-            self.ihc_note = ""
-            self.ihc_position = ""
+        self._remove_notify_event: CALLBACK_TYPE | None = None
+        # The attributes dictionary, and the number of controllers it was built for
+        self._attributes: dict[str, Any] | None = None
+        self._attributes_controllers = 0
+        # Platforms can set a filter for the notified values
+        self.filter: ValueFilter | None = None
+        self._value: Any = None
+        self._cancel_flush: CALLBACK_TYPE | None = None
+        # Platforms that write to the resource can show the written value
+        # before it is confirmed, see async_set_optimistic
+        self.optimistic = False
+        self._confirm: tuple[Any, float] | None = None
+        self._cancel_confirm: CALLBACK_TYPE | None = None
+        self._metrics: IHCMetrics | None = None
+        self._supervisor: IHCConnectionSupervisor | None = None
+        if resource.product_id is not None:
+            self.device_id = f"{self.controller_id}_{resource.product_id}"
+            # this will name the device the same way as the IHC visual application
+            # Product name + position
+            self.device_name = resource.name
+            if self.ihc_position:
+                self.device_name += f" ({self.ihc_position})"
+            self.device_model = resource.model
+            self._attr_device_info = DeviceInfo(
+                identifiers={
+                    # Serial numbers are unique identifiers within a specific domain
+                    (DOMAIN, self.device_id)
+                },
+                name=self.device_name,
+                manufacturer="Schneider Electric",
+                suggested_area=self.suggested_area,
+                model=self.device_model,
+                sw_version="",
+                via_device=(DOMAIN, self.controller_id),
+            )
 
     async def async_added_to_hass(self) -> None:
-        """Add callback for IHC changes."""
+        """Add callback for IHC changes, and set the initial state if known."""
         _LOGGER.debug("Adding IHC entity notify event: %s", self.ihc_id)
-        self.ihc_controller.add_notify_event(
-            self.ihc_id, self.on_ihc_change, delayed=True
+        controller_data = async_get_controller_data(self.hass, self.ihc_controller)
+        if controller_data is None:
+            return
+        notifier = controller_data[IHC_NOTIFIER]
+        self._metrics = controller_data[IHC_CLIENT].metrics
+        self._supervisor = controller_data[IHC_SUPERVISOR]
+        if (value := notifier.get_value(self.ihc_id)) is not None:
+            self._value = value
+            self.on_ihc_change(self.ihc_id, value)
+        self._remove_notify_event = notifier.add_notify_event(
+            self.ihc_id, self._async_handle_ihc_change
+        )
+        if self.filter is not None:
+            # The filter counters are included in the diagnostics
+            filters = controller_data[IHC_FILTERS]
+            filters[self.entity_id] = self.filter
+            self.async_on_remove(partial(filters.pop, self.entity_id, None))
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._supervisor.signal, self.async_write_ha_state
+            )
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Remove the callback for IHC changes."""
+        if self._remove_notify_event is not None:
+            self._remove_notify_event()
+            self._remove_notify_event = None
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        self._async_cancel_confirm()
+
+    @callback
+    def _async_handle_ihc_change(self, ihc_id: int, value: Any) -> None:
+        """Update the entity from a notification and write the state."""
+        if self._confirm is not None:
+            # If the value is not the one we expected, the state is rolled
+            # back by the update below
+            self._async_end_confirm(confirmed=value == self._confirm[0])
+        if self.filter is not None:
+            now = time.monotonic()
+            if (value := self.filter.update(value, self._value, now)) is None:
+                self._async_schedule_flush(now)
+                return
+        self._value = value
+        self.on_ihc_change(ihc_id, value)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_schedule_flush(self, now: float) -> None:
+        """Start a timer for a value held back by the filter."""
+        if self.filter is None or self.filter.pending is None:
+            return
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(
+                self.hass, self.filter.flush_delay(now), self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now: datetime) -> None:
+        """Update the entity with the value held back by the filter."""
+        self._cancel_flush = None
+        if self.filter is None:
+            return
+        now = time.monotonic()
+        if (value := self.filter.flush(now)) is None:
+            # The value held back has changed, wait for the new one
+            self._async_schedule_flush(now)
+            return
+        self._value = value
+        self.on_ihc_change(self.ihc_id, value)
+        self.async_write_ha_state()
+
+    @callback
+    def async_set_optimistic(self, value: Any) -> None:
+        """
+        Show a value written to the resource before the controller confirms it.
+
+        Does nothing if the entity is not optimistic, or the value is the one
+        already shown. Writing the last notified value back while another
+        value is pending restores the notified state, as the controller may
+        not notify a value that ends up unchanged. If the controller does not
+        notify the value within OPTIMISTIC_TIMEOUT, the entity is rolled back
+        to the last notified value.
+        """
+        if not self.optimistic:
+            return
+        shown = self._value if self._confirm is None else self._confirm[0]
+        if value == shown:
+            return
+        if value == self._value:
+            self._async_cancel_confirm()
+            self.on_ihc_change(self.ihc_id, value)
+            self.async_write_ha_state()
+            return
+        self._async_cancel_confirm()
+        self._confirm = (value, time.monotonic())
+        self._cancel_confirm = async_call_later(
+            self.hass, OPTIMISTIC_TIMEOUT, self._async_confirm_timeout
         )
+        self.on_ihc_change(self.ihc_id, value)
+        self.async_write_ha_state()
+
+    @callback
+    def async_rollback(self) -> None:
+        """Roll back an optimistic value, when the write has failed."""
+        if self._confirm is None:
+            return
+        self._async_end_confirm(confirmed=False)
+        # Without a notified value the state is unknown
+        self.on_ihc_change(self.ihc_id, self._value)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_confirm_timeout(self, _now: datetime) -> None:
+        """Roll back, the optimistic value was not confirmed in time."""
+        self._cancel_confirm = None
+        _LOGGER.debug("IHC resource %d did not confirm the value", self.ihc_id)
+        self.async_rollback()
+
+    @callback
+    def _async_end_confirm(self, *, confirmed: bool) -> None:
+        """Stop waiting for a confirmation and record the latency."""
+        if self._confirm is None:
+            return
+        _, start = self._confirm
+        self._async_cancel_confirm()
+        if self._metrics is not None:
+            self._metrics.record(
+                OPERATION_CONFIRM, time.monotonic() - start, success=confirmed
+            )
+
+    @callback
+    def _async_cancel_confirm(self) -> None:
+        """Stop waiting for a confirmation, without recording it."""
+        self._confirm = None
+        if self._cancel_confirm is not None:
+            self._cancel_confirm()
+            self._cancel_confirm = None
 
     @property
     def name(self) -> str:
         """Return the device name."""
         return self._name
 
+    @property
+    def available(self) -> bool:
+        """Return False while the connection to the controller is lost."""
+        return self._supervisor is None or self._supervisor.available
+
     @property
     def unique_id(self) -> str:
         """Return a unique ID."""
@@ -75,40 +260,34 @@ class IHCDevice(Entity):
 
     @property
     def extra_state_attributes(self) -> dict:
-        """Return the state attributes."""
-        attributes = {
-            "ihc_id": self.ihc_id,
-            "ihc_name": self.ihc_name,
-            "ihc_note": self.ihc_note,
-            "ihc_position": self.ihc_position,
-        }
-        if len(self.hass.data[DOMAIN]) > 1:
-            # We only want to show the controller id if we have more than one
-            attributes["ihc_controller"] = self.controller_id
-        return attributes
+        """
+        Return the state attributes.
+
+        The dictionary is reused between state writes, but the number of
+        controllers is checked on every access, as a controller set up later
+        adds the controller id. This saves little, see bench_notify.py.
+        """
+        controllers = len(self.hass.data[DOMAIN])
+        if self._attributes is None or controllers != self._attributes_controllers:
+            self._attributes_controllers = controllers
+            self._attributes = {
+                "ihc_id": self.ihc_id,
+                "ihc_name": self.ihc_name,
+                "ihc_note": self.ihc_note,
+                "ihc_position": self.ihc_position,
+            }
+            if controllers > 1:
+                # We only want to show the controller id if we have more than one
+                self._attributes["ihc_controller"] = self.controller_id
+        return self._attributes
 
     def on_ihc_change(self, _ihc_id: int, value: Any) -> None:
         """
         Handle IHC resource change.
 
         Derived classes must overwrite this to do device specific stuff.
+        This is called in the event loop, and must not write the state.
+        A value of None means the value is unknown, this is only used by
+        platforms that call async_set_optimistic.
         """
         raise NotImplementedError
-
-    @property
-    def device_info(self) -> dict | None:
-        """Return the device info."""
-        if not self.device_id:
-            return None
-        return {
-            "identifiers": {
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.device_id)
-            },
-            "name": self.device_name,
-            "manufacturer": "Schneider Electric",
-            "suggested_area": self.suggested_area,
-            "model": self.device_model,
-            "sw_version": "",
-            "via_device": (DOMAIN, self.controller_id),
-        }
@@ -4,12 +4,23 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
-from homeassistant.components.light import ATTR_BRIGHTNESS, LightEntity
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_TRANSITION,
+    LightEntity,
+    LightEntityFeature,
+)
 from homeassistant.components.light.const import ColorMode
 
-from .const import CONF_DIMMABLE, CONF_OFF_ID, CONF_ON_ID, DOMAIN, IHC_CONTROLLER
+from .const import CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC, DOMAIN, IHC_CONTROLLER
 from .ihcdevice import IHCDevice
-from .util import async_pulse, async_set_bool, async_set_int
+from .util import (
+    async_cancel_transition,
+    async_pulse,
+    async_set_bool,
+    async_set_int,
+    async_transition,
+)
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -17,35 +28,21 @@ if TYPE_CHECKING:
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from ihcsdk.ihccontroller import IHCController
 
+    from .resource import IHCResource
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Load IHC lights based on a config entry."""
-    controller_id: str = str(entry.unique_id)
     controller_data = hass.data[DOMAIN][entry.entry_id]
     ihc_controller: IHCController = controller_data[IHC_CONTROLLER]
-    lights = []
-    if controller_data["light"]:
-        for name, device in controller_data["light"].items():
-            ihc_id = device["ihc_id"]
-            product_cfg = device["product_cfg"]
-            product = device["product"]
-            ihc_off_id = product_cfg.get(CONF_OFF_ID)
-            ihc_on_id = product_cfg.get(CONF_ON_ID)
-            dimmable = product_cfg[CONF_DIMMABLE]
-            light = IhcLight(
-                ihc_controller,
-                controller_id,
-                name,
-                ihc_id,
-                ihc_off_id,
-                ihc_on_id,
-                dimmable,
-                product,
-            )
-            lights.append(light)
-        async_add_entities(lights)
+    optimistic = entry.options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC)
+    if controller_data.get("light"):
+        async_add_entities(
+            IhcLight(ihc_controller, name, resource, optimistic=optimistic)
+            for name, resource in controller_data["light"].items()
+        )
 
 
 class IhcLight(IHCDevice, LightEntity):
@@ -60,23 +57,22 @@ class IhcLight(IHCDevice, LightEntity):
     def __init__(
         self,
         ihc_controller: IHCController,
-        controller_id: str,
         name: str,
-        ihc_id: int,
-        ihc_off_id: int,
-        ihc_on_id: int,
-        dimmable=False,
-        product=None,
+        resource: IHCResource,
+        *,
+        optimistic: bool = False,
     ) -> None:
         """Initialize the light."""
-        super().__init__(ihc_controller, controller_id, name, ihc_id, product)
-        self._ihc_off_id = ihc_off_id
-        self._ihc_on_id = ihc_on_id
+        super().__init__(ihc_controller, name, resource)
+        self.optimistic = optimistic
+        self._ihc_off_id = resource.off_id
+        self._ihc_on_id = resource.on_id
         self._brightness = 0
-        self._dimmable = dimmable
-        self._state = False
+        self._dimmable = resource.dimmable
+        self._state: bool | None = False
         if self._dimmable:
             self._attr_color_mode = ColorMode.BRIGHTNESS
+            self._attr_supported_features = LightEntityFeature.TRANSITION
         else:
             self._attr_color_mode = ColorMode.ONOFF
         self._attr_supported_color_modes = {self._attr_color_mode}
@@ -87,7 +83,7 @@ class IhcLight(IHCDevice, LightEntity):
         return self._brightness
 
     @property
-    def is_on(self) -> bool:
+    def is_on(self) -> bool | None:
         """Return true if light is on."""
         return self._state
 
@@ -99,30 +95,72 @@ class IhcLight(IHCDevice, LightEntity):
             brightness = 255
 
         if self._dimmable:
-            await async_set_int(
-                self.hass, self.ihc_controller, self.ihc_id, int(brightness * 100 / 255)
+            await self._async_set_level(
+                int(brightness * 100 / 255), kwargs.get(ATTR_TRANSITION)
             )
         elif self._ihc_on_id:
-            await async_pulse(self.hass, self.ihc_controller, self._ihc_on_id)
+            self.async_set_optimistic(True)  # noqa: FBT003
+            async_pulse(
+                self.hass,
+                self.ihc_controller,
+                self._ihc_on_id,
+                self.resource.pulse_width,
+            )
         else:
-            await async_set_bool(
+            self.async_set_optimistic(True)  # noqa: FBT003
+            if not await async_set_bool(
                 self.hass, self.ihc_controller, self.ihc_id, value=True
-            )
+            ):
+                self.async_rollback()
 
-    async def async_turn_off(self, **_kwargs: Any) -> None:
+    async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
         if self._dimmable:
-            await async_set_int(self.hass, self.ihc_controller, self.ihc_id, 0)
+            await self._async_set_level(0, kwargs.get(ATTR_TRANSITION))
         elif self._ihc_off_id:
-            await async_pulse(self.hass, self.ihc_controller, self._ihc_off_id)
+            self.async_set_optimistic(False)  # noqa: FBT003
+            async_pulse(
+                self.hass,
+                self.ihc_controller,
+                self._ihc_off_id,
+                self.resource.pulse_width,
+            )
         else:
-            await async_set_bool(
+            self.async_set_optimistic(False)  # noqa: FBT003
+            if not await async_set_bool(
                 self.hass, self.ihc_controller, self.ihc_id, value=False
+            ):
+                self.async_rollback()
+
+    async def _async_set_level(self, level: int, transition: float | None) -> None:
+        """
+        Set the level of a dimmable light, with an optional transition.
+
+        The transition runs in the background, and the state follows the
+        levels notified by the controller. A new level stops the transition
+        in progress.
+        """
+        if transition:
+            start_level = int(self._brightness * 100 / 255) if self._state else 0
+            async_transition(
+                self.hass,
+                self.ihc_controller,
+                self.ihc_id,
+                start_level,
+                level,
+                transition,
             )
+            return
+        async_cancel_transition(self.hass, self.ihc_controller, self.ihc_id)
+        self.async_set_optimistic(level)
+        if not await async_set_int(self.hass, self.ihc_controller, self.ihc_id, level):
+            self.async_rollback()
 
     def on_ihc_change(self, _ihc_id: int, value: Any) -> None:
         """Handle IHC notifications."""
-        if isinstance(value, bool):
+        if value is None:
+            self._state = None
+        elif isinstance(value, bool):
             self._dimmable = False
             self._state = value != 0
         else:
@@ -130,4 +168,3 @@ class IhcLight(IHCDevice, LightEntity):
             self._state = value > 0
             if self._state:
                 self._brightness = int(value * 255 / 100)
-        self.schedule_update_ha_state()
@@ -12,20 +12,31 @@ from homeassistant.const import CONF_ID, CONF_NAME, CONF_TYPE, CONF_UNIT_OF_MEAS
 from homeassistant.core import HomeAssistant
 
 from .const import (
+    CONF_AVERAGE_WINDOW,
     CONF_BINARY_SENSOR,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
     CONF_DIMMABLE,
     CONF_INVERTING,
     CONF_LIGHT,
+    CONF_MIN_HOLD,
+    CONF_MIN_INTERVAL,
     CONF_NOTE,
+    CONF_OFF_DELAY,
     CONF_OFF_ID,
+    CONF_ON_DELAY,
     CONF_ON_ID,
     CONF_POSITION,
+    CONF_PULSE_WIDTH,
     CONF_SENSOR,
     CONF_SWITCH,
+    DEFAULT_PULSE_WIDTH,
     DOMAIN,
     IHC_PLATFORMS,
     MANUAL_SETUP_YAML,
 )
+from .resource import IHCResource
+from .sensorfilter import BINARY_SENSOR_FILTER_SCHEMA, SENSOR_FILTER_SCHEMA
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,6 +64,9 @@ SWITCH_SCHEMA = DEVICE_SCHEMA.extend(
     {
         vol.Optional(CONF_OFF_ID, default=0): cv.positive_int,
         vol.Optional(CONF_ON_ID, default=0): cv.positive_int,
+        vol.Optional(CONF_PULSE_WIDTH, default=DEFAULT_PULSE_WIDTH): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=10)
+        ),
     }
 )
 
@@ -60,6 +74,7 @@ BINARY_SENSOR_SCHEMA = DEVICE_SCHEMA.extend(
     {
         vol.Optional(CONF_INVERTING, default=False): cv.boolean,
         vol.Optional(CONF_TYPE): DEVICE_CLASSES_SCHEMA,
+        **BINARY_SENSOR_FILTER_SCHEMA,
     }
 )
 
@@ -68,11 +83,14 @@ LIGHT_SCHEMA = DEVICE_SCHEMA.extend(
         vol.Optional(CONF_DIMMABLE, default=False): cv.boolean,
         vol.Optional(CONF_OFF_ID, default=0): cv.positive_int,
         vol.Optional(CONF_ON_ID, default=0): cv.positive_int,
+        vol.Optional(CONF_PULSE_WIDTH, default=DEFAULT_PULSE_WIDTH): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=10)
+        ),
     }
 )
 
 SENSOR_SCHEMA = DEVICE_SCHEMA.extend(
-    {vol.Optional(CONF_UNIT_OF_MEASUREMENT): cv.string}
+    {vol.Optional(CONF_UNIT_OF_MEASUREMENT): cv.string, **SENSOR_FILTER_SCHEMA}
 )
 
 
@@ -137,24 +155,27 @@ def manual_setup(hass: HomeAssistant, entry: ConfigEntry) -> None:
             platform_setup = controller_conf.get(platform, {})
             for sensor_cfg in platform_setup:
                 name = sensor_cfg[CONF_NAME]
-                device = {
-                    "ihc_id": sensor_cfg[CONF_ID],
-                    "ctrl_id": controller_id,
-                    "product": {
-                        "name": name,
-                        "note": sensor_cfg.get(CONF_NOTE) or "",
-                        "position": sensor_cfg.get(CONF_POSITION) or "",
-                    },
-                    "product_cfg": {
-                        "type": sensor_cfg.get(CONF_TYPE),
-                        "inverting": sensor_cfg.get(CONF_INVERTING),
-                        "off_id": sensor_cfg.get(CONF_OFF_ID),
-                        "on_id": sensor_cfg.get(CONF_ON_ID),
-                        "dimmable": sensor_cfg.get(CONF_DIMMABLE),
-                        "unit_of_measurement": sensor_cfg.get(CONF_UNIT_OF_MEASUREMENT),
-                    },
-                }
-                discovery_info[name] = device
+                discovery_info[name] = IHCResource.create(
+                    ihc_id=sensor_cfg[CONF_ID],
+                    controller_id=controller_id,
+                    name=name,
+                    note=sensor_cfg.get(CONF_NOTE) or "",
+                    position=sensor_cfg.get(CONF_POSITION) or "",
+                    sensor_type=sensor_cfg.get(CONF_TYPE),
+                    inverting=sensor_cfg.get(CONF_INVERTING, False),
+                    dimmable=sensor_cfg.get(CONF_DIMMABLE, False),
+                    unit=sensor_cfg.get(CONF_UNIT_OF_MEASUREMENT),
+                    off_id=sensor_cfg.get(CONF_OFF_ID),
+                    on_id=sensor_cfg.get(CONF_ON_ID),
+                    pulse_width=sensor_cfg.get(CONF_PULSE_WIDTH, DEFAULT_PULSE_WIDTH),
+                    deadband=sensor_cfg.get(CONF_DEADBAND),
+                    deadband_percent=sensor_cfg.get(CONF_DEADBAND_PERCENT),
+                    min_interval=sensor_cfg.get(CONF_MIN_INTERVAL),
+                    average_window=sensor_cfg.get(CONF_AVERAGE_WINDOW),
+                    on_delay=sensor_cfg.get(CONF_ON_DELAY),
+                    off_delay=sensor_cfg.get(CONF_OFF_DELAY),
+                    min_hold=sensor_cfg.get(CONF_MIN_HOLD),
+                )
         if discovery_info:
             if platform in hass.data[DOMAIN][entry.entry_id]:
                 hass.data[DOMAIN][entry.entry_id][platform].update(discovery_info)
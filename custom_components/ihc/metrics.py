@@ -0,0 +1,147 @@
+"""Latency metrics for the requests to an IHC controller."""
+
+import math
+from collections import deque
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+# Number of recent latencies kept for the percentiles
+RECENT_SIZE = 100
+# The percentiles of the recent latencies
+PERCENTILES = (50, 90, 99)
+
+# The operations we measure, named as the controller SOAP actions
+OPERATION_AUTHENTICATE = "authenticate"
+OPERATION_GET_PROJECT = "getProject"
+OPERATION_GET_PROJECT_INFO = "getProjectInfo"
+OPERATION_GET_SYSTEM_INFO = "getSystemInfo"
+OPERATION_GET_VALUES = "getResourceValues"
+OPERATION_SET_VALUE = "setResourceValue"
+OPERATION_SET_VALUES = "setResourceValues"
+OPERATION_ENABLE_NOTIFICATIONS = "enableRuntimeValueNotifications"
+OPERATION_WAIT_FOR_CHANGES = "waitForResourceValueChanges"
+# From an optimistic state update until the controller confirms it
+OPERATION_CONFIRM = "confirmation"
+# From losing the controller until it is reconnected and resynced
+OPERATION_RECONNECT = "reconnect"
+OPERATIONS = (
+    OPERATION_AUTHENTICATE,
+    OPERATION_GET_PROJECT,
+    OPERATION_GET_PROJECT_INFO,
+    OPERATION_GET_SYSTEM_INFO,
+    OPERATION_GET_VALUES,
+    OPERATION_SET_VALUE,
+    OPERATION_SET_VALUES,
+    OPERATION_ENABLE_NOTIFICATIONS,
+    OPERATION_WAIT_FOR_CHANGES,
+    OPERATION_CONFIRM,
+    OPERATION_RECONNECT,
+)
+
+
+class OperationStats:
+    """
+    Counters and a latency histogram for one operation.
+
+    The last RECENT_SIZE latencies are kept too, for the percentiles of the
+    recent requests.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the operation stats."""
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.min_time: float | None = None
+        self.max_time: float | None = None
+        self.last_time: float | None = None
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.recent: deque[float] = deque(maxlen=RECENT_SIZE)
+
+    @property
+    def average_time(self) -> float | None:
+        """Return the average latency in seconds."""
+        if self.count == 0:
+            return None
+        return self.total_time / self.count
+
+    def record(self, seconds: float, *, success: bool = True) -> None:
+        """Record the latency of a request."""
+        self.count += 1
+        if not success:
+            self.errors += 1
+        self.total_time += seconds
+        self.last_time = seconds
+        self.recent.append(seconds)
+        self.min_time = (
+            seconds if self.min_time is None else min(self.min_time, seconds)
+        )
+        self.max_time = (
+            seconds if self.max_time is None else max(self.max_time, seconds)
+        )
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def percentiles(self) -> dict[str, float]:
+        """Return the percentiles of the recent latencies, nearest rank."""
+        if not self.recent:
+            return {}
+        ordered = sorted(self.recent)
+        return {
+            f"p{percentile}": ordered[
+                max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+            ]
+            for percentile in PERCENTILES
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats as a dictionary, the histogram is cumulative."""
+        histogram = {}
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets, strict=True):
+            cumulative += count
+            histogram["+Inf" if math.isinf(bound) else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "average": self.average_time,
+            "min": self.min_time,
+            "max": self.max_time,
+            "last": self.last_time,
+            "recent": self.percentiles(),
+            "histogram": histogram,
+        }
+
+
+class IHCMetrics:
+    """
+    Latency metrics for the requests to a controller, per operation.
+
+    Requests are recorded from the event loop and from executor jobs, the
+    updates are simple enough to not need locking.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.operations: dict[str, OperationStats] = {
+            operation: OperationStats() for operation in OPERATIONS
+        }
+
+    def get(self, operation: str) -> OperationStats:
+        """Get the stats of an operation."""
+        if operation not in self.operations:
+            self.operations[operation] = OperationStats()
+        return self.operations[operation]
+
+    def record(self, operation: str, seconds: float, *, success: bool = True) -> None:
+        """Record the latency of a request."""
+        self.get(operation).record(seconds, success=success)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the metrics of all operations as a dictionary."""
+        return {
+            operation: stats.as_dict() for operation, stats in self.operations.items()
+        }
@@ -0,0 +1,221 @@
+"""Receive resource value notifications from the IHC controller."""
+
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .aioclient import IHCAsyncClient
+from .supervisor import IHCConnectionSupervisor
+from .valuecache import IHCValueCache
+
+if TYPE_CHECKING:
+    import asyncio
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds the controller waits for changes before answering a long poll
+NOTIFY_WAIT = 10
+# Maximum number of resources in a single getRuntimeValues request
+FETCH_BATCH_SIZE = 200
+
+
+class IHCNotifier:
+    """
+    Long poll the controller for resource value changes.
+
+    This replaces the notification thread in ihcsdk. The long polling runs in
+    an asyncio task, and the callbacks are called in the event loop.
+    Like ihcsdk a callback is only called when the value has changed.
+    The changes from one poll are delivered together in the event loop.
+    When a poll fails the supervisor reconnects, and the values of all
+    resources are read again, so the changes missed meanwhile are delivered.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: IHCAsyncClient,
+        value_cache: IHCValueCache,
+        supervisor: IHCConnectionSupervisor,
+    ) -> None:
+        """Initialize the notifier. All values received are set in the cache."""
+        self.hass = hass
+        self.client = client
+        self.value_cache = value_cache
+        self.supervisor = supervisor
+        self._callbacks: dict[int, list[Callable[[int, Any], None]]] = {}
+        self._values: dict[int, Any] = {}
+        self._new_ids: list[int] = []
+        self._task: asyncio.Task | None = None
+        # Number of values, and the seconds it took, in the initial fetch
+        self.initial_values = 0
+        self.initial_values_time: float | None = None
+
+    @callback
+    def add_notify_event(
+        self, ihc_id: int, notify_callback: Callable[[int, Any], None]
+    ) -> Callable[[], None]:
+        """
+        Add a callback for changes of a resource value.
+
+        The controller is only subscribed once for each resource, no matter how
+        many callbacks there are. Return a function to remove the callback.
+        """
+        if ihc_id in self._callbacks:
+            self._callbacks[ihc_id].append(notify_callback)
+        else:
+            self._callbacks[ihc_id] = [notify_callback]
+            self._new_ids.append(ihc_id)
+            if self._task is None:
+                self._task = self.hass.async_create_background_task(
+                    self._async_run(), "ihc notifications"
+                )
+
+        @callback
+        def remove_notify_event() -> None:
+            """Remove the callback."""
+            self.remove_notify_event(ihc_id, notify_callback)
+
+        return remove_notify_event
+
+    @callback
+    def remove_notify_event(
+        self, ihc_id: int, notify_callback: Callable[[int, Any], None]
+    ) -> None:
+        """Remove a callback, forget the resource if it was the last one."""
+        callbacks = self._callbacks.get(ihc_id)
+        if callbacks is None or notify_callback not in callbacks:
+            return
+        callbacks.remove(notify_callback)
+        if callbacks:
+            return
+        del self._callbacks[ihc_id]
+        self._values.pop(ihc_id, None)
+        if ihc_id in self._new_ids:
+            self._new_ids.remove(ihc_id)
+
+    @property
+    def registrations(self) -> int:
+        """Return the number of resources with callbacks."""
+        return len(self._callbacks)
+
+    @property
+    def callbacks(self) -> int:
+        """Return the number of callbacks for all resources."""
+        return sum(len(callbacks) for callbacks in self._callbacks.values())
+
+    @callback
+    def get_value(self, ihc_id: int) -> Any:
+        """Return the last known value of a resource, or None if not known."""
+        return self._values.get(ihc_id)
+
+    async def async_fetch_values(self, ihc_ids: list[int]) -> None:
+        """
+        Read the current values of resources in a few batched reads.
+
+        The values are used for the initial state of the entities, and a
+        following notification with the same value is ignored.
+        """
+        start = time.monotonic()
+        async for values in self._async_read_values(ihc_ids):
+            if values is None:
+                _LOGGER.warning("Unable to read the IHC resource values")
+                continue
+            self._values.update(values)
+            self.value_cache.update(values)
+            self.initial_values += len(values)
+        self.initial_values_time = time.monotonic() - start
+        _LOGGER.debug(
+            "Read %d IHC resource values in %.3f seconds",
+            self.initial_values,
+            self.initial_values_time,
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the long polling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_run(self) -> None:
+        """Long poll the controller for changes until stopped."""
+        _LOGGER.debug("Starting IHC notifications")
+        while True:
+            try:
+                if self._new_ids:
+                    new_ids, self._new_ids = self._new_ids, []
+                    if not await self.client.async_enable_notifications(new_ids):
+                        self._new_ids.extend(new_ids)
+                changes = await self.client.async_wait_for_changes(NOTIFY_WAIT)
+            except Exception:
+                # Reconnect like a failed poll, the resync enables the
+                # notifications of all resources again
+                _LOGGER.exception("Error receiving IHC notifications")
+                changes = None
+            if changes is None:
+                await self.supervisor.async_reconnect(self._async_resync)
+                continue
+            self._async_handle_changes(changes)
+
+    @callback
+    def _async_handle_changes(self, changes: list[tuple[int, Any]]) -> None:
+        """
+        Handle the changes from a single poll as one batch.
+
+        Only the last value of a resource is used, so each callback is called
+        at most once per batch.
+        """
+        latest = dict(changes)
+        self.value_cache.update(latest)
+        for ihc_id, value in latest.items():
+            if ihc_id not in self._callbacks:
+                continue
+            if ihc_id in self._values and self._values[ihc_id] == value:
+                continue
+            self._values[ihc_id] = value
+            for notify_callback in self._callbacks[ihc_id]:
+                try:
+                    notify_callback(ihc_id, value)
+                except Exception:
+                    _LOGGER.exception("Error handling IHC notification")
+
+    async def _async_read_values(
+        self, ihc_ids: list[int]
+    ) -> AsyncIterator[dict[int, Any] | None]:
+        """Read the values of resources in batches, None for a failed batch."""
+        ihc_ids = list(dict.fromkeys(ihc_ids))
+        for index in range(0, len(ihc_ids), FETCH_BATCH_SIZE):
+            yield await self.client.async_get_runtime_values(
+                ihc_ids[index : index + FETCH_BATCH_SIZE]
+            )
+
+    async def _async_resync(self) -> bool:
+        """
+        Enable the notifications for all resources, and read their values.
+
+        Called after a reconnect. The notifications are enabled first, so no
+        change is lost between the read and the next poll. The values that
+        changed while the controller was lost are delivered as one batch.
+        Return False if it failed, so the supervisor tries again.
+        """
+        self._new_ids = []
+        ihc_ids = list(self._callbacks)
+        if not ihc_ids:
+            return True
+        changes: list[tuple[int, Any]] = []
+        try:
+            if not await self.client.async_enable_notifications(ihc_ids):
+                return False
+            async for values in self._async_read_values(ihc_ids):
+                if values is None:
+                    return False
+                changes.extend(values.items())
+        except Exception:
+            _LOGGER.exception("Error reading the IHC resource values")
+            return False
+        self._async_handle_changes(changes)
+        return True
@@ -0,0 +1,95 @@
+"""Profiling of the IHC controller setup phases."""
+
+import json
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Number of setup runs kept in the history
+HISTORY_SIZE = 50
+
+PHASE_AUTHENTICATE = "authenticate"
+PHASE_SYSTEM_INFO = "system_info"
+PHASE_PROJECT_AUTHENTICATE = "project_authenticate"
+PHASE_PROJECT_DOWNLOAD = "project_download"
+PHASE_XML_PARSE = "xml_parse"
+PHASE_DISCOVERY = "discovery"
+PHASE_MANUAL_SETUP = "manual_setup"
+PHASE_INITIAL_VALUES = "initial_values"
+
+
+class StartupProfiler:
+    """
+    Measure the phases of a controller setup.
+
+    The phases can be measured in the event loop and in executor jobs, and
+    phases can overlap. When the setup is done the timings are logged as a
+    single json line, and added to a history in the Home Assistant storage
+    folder, to track the startup time across releases and project sizes.
+    """
+
+    def __init__(self, hass: HomeAssistant, controller_id: str) -> None:
+        """Initialize the profiler, the start time is now."""
+        self._store: Store[list[dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"ihc.{controller_id}.startup"
+        )
+        self._start = time.monotonic()
+        self.controller_id = controller_id
+        self.phases: dict[str, float] = {}
+        self.info: dict[str, Any] = {}
+        self.total: float | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the code in the with block as a phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time to a phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def iter_timed[T](self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Iterate, adding the time spent producing the items to a phase."""
+        iterator = iter(iterable)
+        while True:
+            start = time.monotonic()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.monotonic() - start)
+                return
+            self.add(name, time.monotonic() - start)
+            yield item
+
+    async def async_finish(self, **info: Any) -> None:
+        """Log the timings of the setup and add them to the history."""
+        self.total = time.monotonic() - self._start
+        self.info.update(info)
+        run = {
+            "time": dt_util.utcnow().isoformat(),
+            "controller_id": self.controller_id,
+            "total": round(self.total, 3),
+            "phases": {name: round(value, 3) for name, value in self.phases.items()},
+            **self.info,
+        }
+        _LOGGER.debug("IHC startup profile: %s", json.dumps(run))
+        history = await self._store.async_load() or []
+        history.append(run)
+        await self._store.async_save(history[-HISTORY_SIZE:])
+
+    async def async_get_history(self) -> list[dict[str, Any]]:
+        """Get the timings of the previous setups."""
+        return await self._store.async_load() or []
@@ -0,0 +1,103 @@
+"""Send on/off pulses to IHC controller resources."""
+
+import asyncio
+import logging
+from functools import partial
+
+from homeassistant.core import HomeAssistant, callback
+
+from .batcher import IHCWriteBatcher
+from .const import DEFAULT_PULSE_WIDTH, VALUE_TYPE_BOOL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IHCPulseEngine:
+    """
+    Send on/off pulses to the resources of a controller.
+
+    A pulse is queued on the write batcher and the caller gets a future for
+    the result right away, so nobody waits for the pulse width. The off write
+    is queued by a loop timer when the on write is done. With a pulse width
+    of 0 the on and off writes are sent in the same request. A pulse to a
+    resource that already has a pulse in flight is merged with it.
+    """
+
+    def __init__(self, hass: HomeAssistant, batcher: IHCWriteBatcher) -> None:
+        """Initialize the pulse engine."""
+        self.hass = hass
+        self.batcher = batcher
+        self.pulses = 0
+        self.merged = 0
+        self._in_flight: dict[int, asyncio.Future[bool]] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+
+    @callback
+    def async_pulse(
+        self, ihc_id: int, width: float = DEFAULT_PULSE_WIDTH
+    ) -> asyncio.Future[bool]:
+        """Queue a pulse, the future has the result."""
+        if (future := self._in_flight.get(ihc_id)) is not None:
+            self.merged += 1
+            return future
+        self.pulses += 1
+        future = self.hass.loop.create_future()
+        self._in_flight[ihc_id] = future
+        on_write = self.batcher.async_write(ihc_id, VALUE_TYPE_BOOL, value=True)
+        if width <= 0:
+            self._async_write_off(ihc_id, on_write)
+        else:
+            on_write.add_done_callback(partial(self._async_on_written, ihc_id, width))
+        return future
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the pulses in flight."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for future in self._in_flight.values():
+            future.cancel()
+        self._in_flight.clear()
+
+    @callback
+    def _async_on_written(
+        self, ihc_id: int, width: float, on_write: asyncio.Future[bool]
+    ) -> None:
+        """Start the timer for the off write."""
+        if ihc_id not in self._in_flight:
+            return
+        self._timers[ihc_id] = self.hass.loop.call_later(
+            width, self._async_write_off, ihc_id, on_write
+        )
+
+    @callback
+    def _async_write_off(self, ihc_id: int, on_write: asyncio.Future[bool]) -> None:
+        """Queue the off write of a pulse."""
+        self._timers.pop(ihc_id, None)
+        if ihc_id not in self._in_flight:
+            return
+        # The off write is sent even if the on write failed, so the
+        # resource is not left on
+        off_write = self.batcher.async_write(ihc_id, VALUE_TYPE_BOOL, value=False)
+        off_write.add_done_callback(partial(self._async_pulse_done, ihc_id, on_write))
+
+    @callback
+    def _async_pulse_done(
+        self,
+        ihc_id: int,
+        on_write: asyncio.Future[bool],
+        off_write: asyncio.Future[bool],
+    ) -> None:
+        """Set the result of a pulse when both writes are done."""
+        future = self._in_flight.pop(ihc_id, None)
+        # Both writes are checked, so their exceptions are retrieved
+        results = [
+            not write.cancelled() and write.exception() is None and write.result()
+            for write in (on_write, off_write)
+        ]
+        if future is None or future.done():
+            return
+        if not (result := all(results)):
+            _LOGGER.warning("Unable to pulse IHC resource %d", ihc_id)
+        future.set_result(result)
@@ -0,0 +1,69 @@
+"""Adaptive rate limiting of requests to the IHC controller."""
+
+import asyncio
+import time
+
+from .const import DEFAULT_WRITE_BURST, DEFAULT_WRITE_RATE
+
+# The rate is never lowered below this
+MIN_RATE = 1.0
+# Average response time in seconds where we start slowing down
+SLOW_RESPONSE_TIME = 1.0
+# Weight of the latest response time in the average
+RESPONSE_TIME_WEIGHT = 0.2
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket limiting the request rate to a controller.
+
+    The rate is halved when the average response time of the controller is
+    above SLOW_RESPONSE_TIME, and slowly raised again when the controller
+    responds fast. The limiter is used by a single task, so it has no locking.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_WRITE_RATE,
+        burst: int = DEFAULT_WRITE_BURST,
+        min_rate: float = MIN_RATE,
+    ) -> None:
+        """Initialize the rate limiter."""
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.response_time: float | None = None
+        # Number of times we had to wait, and the total seconds waited
+        self.waits = 0
+        self.wait_time = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def async_acquire(self) -> None:
+        """Wait until a request may be sent."""
+        self._refill()
+        if self._tokens < 1:
+            delay = (1 - self._tokens) / self.rate
+            self.waits += 1
+            self.wait_time += delay
+            await asyncio.sleep(delay)
+            self._refill()
+        self._tokens -= 1
+
+    def record_response_time(self, seconds: float) -> None:
+        """Update the average response time, and adapt the rate to it."""
+        if self.response_time is None:
+            self.response_time = seconds
+        else:
+            self.response_time += RESPONSE_TIME_WEIGHT * (seconds - self.response_time)
+        if self.response_time > SLOW_RESPONSE_TIME:
+            self.rate = max(self.min_rate, self.rate / 2)
+        elif self.response_time < SLOW_RESPONSE_TIME / 2:
+            self.rate = min(self.max_rate, self.rate * 1.25)
+
+    def _refill(self) -> None:
+        """Add the tokens for the time passed."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,61 @@
+"""Descriptor of an IHC resource set up as an entity."""
+
+import sys
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .const import DEFAULT_PULSE_WIDTH
+
+
+@dataclass(frozen=True, slots=True)
+class IHCResource:
+    """
+    Descriptor of an IHC resource from the auto setup or manual setup.
+
+    There is a descriptor for each resource in the project, and they are kept
+    for the life of the config entry. They are slotted, and the strings are
+    interned because many resources share the same product and group. The
+    rule options are only set for the platforms they apply to.
+    """
+
+    ihc_id: int
+    controller_id: str
+    # The product the resource belongs to
+    product_id: int | None = None
+    name: str = ""
+    note: str = ""
+    position: str = ""
+    model: str = ""
+    group: str | None = None
+    # Options from the auto setup rule or the manual setup
+    sensor_type: str | None = None
+    inverting: bool = False
+    dimmable: bool = False
+    unit: str | None = None
+    off_id: int | None = None
+    on_id: int | None = None
+    pulse_width: float = DEFAULT_PULSE_WIDTH
+    # Sensor filter options, see SensorFilter
+    deadband: float | None = None
+    deadband_percent: float | None = None
+    min_interval: float | None = None
+    average_window: float | None = None
+    # Binary sensor debounce options, see BinarySensorFilter
+    on_delay: float | None = None
+    off_delay: float | None = None
+    min_hold: float | None = None
+
+    @classmethod
+    def create(cls, **fields: Any) -> "IHCResource":
+        """Create a descriptor with the strings interned."""
+        # Strings from the yaml files are str subclasses, that cannot be interned
+        return cls(
+            **{
+                key: sys.intern(str(value)) if isinstance(value, str) else value
+                for key, value in fields.items()
+            }
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the descriptor as a dictionary, for the discovery cache."""
+        return asdict(self)
@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
-from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfTime,
+)
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.util.unit_system import TEMPERATURE_UNITS
 
-from .const import DOMAIN, IHC_CONTROLLER
+from .const import DOMAIN, IHC_CLIENT, IHC_CONTROLLER
 from .ihcdevice import IHCDevice
+from .metrics import OPERATIONS
+from .sensorfilter import SensorFilter
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -17,6 +28,12 @@ if TYPE_CHECKING:
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from ihcsdk.ihccontroller import IHCController
 
+    from .metrics import IHCMetrics
+    from .resource import IHCResource
+
+# Only the latency sensors are polled, the IHC sensors are pushed
+SCAN_INTERVAL = timedelta(seconds=60)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -25,44 +42,73 @@ async def async_setup_entry(
     controller_id: str = str(entry.unique_id)
     controller_data = hass.data[DOMAIN][entry.entry_id]
     ihc_controller: IHCController = controller_data[IHC_CONTROLLER]
-    sensors = []
+    metrics = controller_data[IHC_CLIENT].metrics
+    async_add_entities(
+        IHCLatencySensor(metrics, controller_id, operation) for operation in OPERATIONS
+    )
     if controller_data.get("sensor"):
-        for name, device in controller_data["sensor"].items():
-            ihc_id = device["ihc_id"]
-            product_cfg = device["product_cfg"]
-            product = device["product"]
-            unit = product_cfg[CONF_UNIT_OF_MEASUREMENT]
-            sensor = IHCSensor(
-                ihc_controller,
-                controller_id,
-                name,
-                ihc_id,
-                unit,
-                product,
-            )
-            sensors.append(sensor)
-        async_add_entities(sensors)
+        async_add_entities(
+            IHCSensor(ihc_controller, name, resource)
+            for name, resource in controller_data["sensor"].items()
+        )
 
 
 class IHCSensor(IHCDevice, SensorEntity):
     """Implementation of the IHC sensor."""
 
     def __init__(
-        self,
-        ihc_controller: IHCController,
-        controller_id: str,
-        name: str,
-        ihc_id: int,
-        unit: str,
-        product=None,
+        self, ihc_controller: IHCController, name: str, resource: IHCResource
     ) -> None:
         """Initialize the IHC sensor."""
-        super().__init__(ihc_controller, controller_id, name, ihc_id, product)
-        self._attr_native_unit_of_measurement = unit
+        super().__init__(ihc_controller, name, resource)
+        self._attr_native_unit_of_measurement = unit = resource.unit
         if unit in TEMPERATURE_UNITS:
             self._attr_device_class = SensorDeviceClass.TEMPERATURE
+        self.filter = SensorFilter.from_resource(resource)
 
     def on_ihc_change(self, _ihc_id: int, value: Any) -> None:
         """Handle IHC resource change."""
         self._attr_native_value = value
-        self.schedule_update_ha_state()
+
+
+class IHCLatencySensor(SensorEntity):
+    """
+    Diagnostic sensor with the latency of a controller operation.
+
+    The sensors are disabled by default. The state is the average latency of
+    the requests since the last update. The counters and the latency
+    histogram since startup are attributes, the histogram and the recent
+    percentiles are not recorded.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    # The histogram and percentiles change on every update, and are in the
+    # diagnostics too, so they are not recorded
+    _unrecorded_attributes = frozenset({"histogram", "recent"})
+
+    def __init__(self, metrics: IHCMetrics, controller_id: str, operation: str) -> None:
+        """Initialize the latency sensor."""
+        self._stats = metrics.get(operation)
+        self._count = 0
+        self._total_time = 0.0
+        self._attr_name = f"{operation} latency"
+        self._attr_unique_id = f"{controller_id}-latency-{operation}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, controller_id)})
+
+    async def async_update(self) -> None:
+        """Update the average latency from the requests since last update."""
+        stats = self._stats
+        if stats.count > self._count:
+            average = (stats.total_time - self._total_time) / (
+                stats.count - self._count
+            )
+            self._attr_native_value = average * 1000
+        self._count = stats.count
+        self._total_time = stats.total_time
+        self._attr_extra_state_attributes = stats.as_dict()
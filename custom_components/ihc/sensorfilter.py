@@ -0,0 +1,219 @@
+"""Filter the values of IHC sensors to limit the state updates."""
+
+from collections import deque
+from typing import Any
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+from .const import (
+    CONF_AVERAGE_WINDOW,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_MIN_HOLD,
+    CONF_MIN_INTERVAL,
+    CONF_OFF_DELAY,
+    CONF_ON_DELAY,
+)
+from .resource import IHCResource
+
+# The filter options of a sensor in the auto setup and manual setup files
+SENSOR_FILTER_SCHEMA = {
+    vol.Optional(CONF_DEADBAND): cv.positive_float,
+    vol.Optional(CONF_DEADBAND_PERCENT): cv.positive_float,
+    vol.Optional(CONF_MIN_INTERVAL): cv.positive_float,
+    vol.Optional(CONF_AVERAGE_WINDOW): cv.positive_float,
+}
+
+# The debounce options of a binary sensor
+BINARY_SENSOR_FILTER_SCHEMA = {
+    vol.Optional(CONF_ON_DELAY): cv.positive_float,
+    vol.Optional(CONF_OFF_DELAY): cv.positive_float,
+    vol.Optional(CONF_MIN_HOLD): cv.positive_float,
+}
+
+
+class SensorFilter:
+    """
+    Dead-band, rate limit and averaging filter for a numeric sensor.
+
+    A new value is published when it differs from the published value by
+    more than all configured dead-bands. If it comes sooner than min_interval
+    after the last published value it is held back as pending, and the owner
+    must call flush when the interval has passed. With an average window the
+    filtered value is the average of the values received in the window.
+    Values that are not numbers are always published. Times are monotonic
+    seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        deadband: float | None = None,
+        deadband_percent: float | None = None,
+        min_interval: float | None = None,
+        average_window: float | None = None,
+    ) -> None:
+        """Initialize the filter."""
+        self.deadband = deadband
+        self.deadband_percent = deadband_percent
+        self.min_interval = min_interval
+        self.average_window = average_window
+        self._samples: deque[tuple[float, float]] = deque()
+        self._last_time: float | None = None
+        self.pending: Any = None
+        # Values dropped by the dead-band, and values held back by the interval
+        self.suppressed = 0
+        self.delayed = 0
+
+    @classmethod
+    def from_resource(cls, resource: IHCResource) -> "SensorFilter | None":
+        """Create the filter for a resource, or None if it has no filter options."""
+        options = {
+            "deadband": resource.deadband,
+            "deadband_percent": resource.deadband_percent,
+            "min_interval": resource.min_interval,
+            "average_window": resource.average_window,
+        }
+        if all(option is None for option in options.values()):
+            return None
+        return cls(**options)
+
+    def update(self, value: Any, published: Any, now: float) -> Any:
+        """Filter a new value, return the value to publish or None."""
+        if not is_number(value):
+            return self._publish(value, now)
+        if self.average_window:
+            self._samples.append((now, value))
+            while self._samples[0][0] < now - self.average_window:
+                self._samples.popleft()
+            value = sum(sample for _, sample in self._samples) / len(self._samples)
+        if is_number(published) and not self._exceeds_deadband(value, published):
+            self.pending = None
+            self.suppressed += 1
+            return None
+        if (
+            self.min_interval
+            and self._last_time is not None
+            and now - self._last_time < self.min_interval
+        ):
+            self.pending = value
+            self.delayed += 1
+            return None
+        return self._publish(value, now)
+
+    def flush(self, now: float) -> Any:
+        """Return the pending value to publish, or None."""
+        if self.pending is None:
+            return None
+        return self._publish(self.pending, now)
+
+    def flush_delay(self, now: float) -> float:
+        """Return the seconds until the pending value can be published."""
+        if self._last_time is None or not self.min_interval:
+            return 0.0
+        return max(0.0, self._last_time + self.min_interval - now)
+
+    def _exceeds_deadband(self, value: float, published: float) -> bool:
+        """Return True if the change exceeds all the configured dead-bands."""
+        change = abs(value - published)
+        if self.deadband is not None and change < self.deadband:
+            return False
+        return not (
+            self.deadband_percent is not None
+            and change < abs(published) * self.deadband_percent / 100
+        )
+
+    def _publish(self, value: Any, now: float) -> Any:
+        """Record a value as published and return it."""
+        self.pending = None
+        self._last_time = now
+        return value
+
+
+class BinarySensorFilter:
+    """
+    Debounce filter for a binary sensor.
+
+    A change must be stable for the on or off delay before it is published,
+    and a published value is held for at least min_hold. A change that is
+    reverted before it is published is a glitch, and is suppressed. The
+    delays are for the resource values, from_resource swaps them for an
+    inverting sensor. Times are monotonic seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_delay: float | None = None,
+        off_delay: float | None = None,
+        min_hold: float | None = None,
+    ) -> None:
+        """Initialize the filter."""
+        self.on_delay = on_delay or 0.0
+        self.off_delay = off_delay or 0.0
+        self.min_hold = min_hold or 0.0
+        self._due = 0.0
+        self._last_time: float | None = None
+        self.pending: bool | None = None
+        # Edges dropped as glitches, and edges held back by the delays
+        self.suppressed = 0
+        self.delayed = 0
+
+    @classmethod
+    def from_resource(cls, resource: IHCResource) -> "BinarySensorFilter | None":
+        """Create the filter for a resource, or None if it has no debounce options."""
+        on_delay, off_delay = resource.on_delay, resource.off_delay
+        if on_delay is None and off_delay is None and resource.min_hold is None:
+            return None
+        if resource.inverting:
+            on_delay, off_delay = off_delay, on_delay
+        return cls(on_delay=on_delay, off_delay=off_delay, min_hold=resource.min_hold)
+
+    def update(self, value: Any, published: Any, now: float) -> bool | None:
+        """Filter a new value, return the value to publish or None."""
+        value = bool(value)
+        if published is None:
+            return self._publish(value, now)
+        if value == bool(published):
+            if self.pending is not None:
+                self.pending = None
+                self.suppressed += 1
+            return None
+        if self.pending is not None:
+            # Already waiting for this change
+            return None
+        delay = self.on_delay if value else self.off_delay
+        if self._last_time is not None:
+            delay = max(delay, self._last_time + self.min_hold - now)
+        if delay <= 0:
+            return self._publish(value, now)
+        self.pending = value
+        self._due = now + delay
+        self.delayed += 1
+        return None
+
+    def flush(self, now: float) -> bool | None:
+        """Return the pending value if it is due to be published, or None."""
+        if self.pending is None or now < self._due:
+            return None
+        return self._publish(self.pending, now)
+
+    def flush_delay(self, now: float) -> float:
+        """Return the seconds until the pending value can be published."""
+        return max(0.0, self._due - now)
+
+    def _publish(self, value: bool, now: float) -> bool:  # noqa: FBT001
+        """Record a value as published and return it."""
+        self.pending = None
+        self._last_time = now
+        return value
+
+
+# The filters used by IHCDevice
+ValueFilter = SensorFilter | BinarySensorFilter
+
+
+def is_number(value: Any) -> bool:
+    """Return True if the value is an int or float, but not a bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
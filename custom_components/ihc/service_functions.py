@@ -1,28 +1,61 @@
 """Support for IHC devices."""
 
+import asyncio
+import datetime
+from typing import Any
+
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from ihcsdk.ihccontroller import IHCController
 
+from .batcher import PRIORITY_LOW
 from .const import (
     ATTR_CONTROLLER_ID,
     ATTR_IHC_ID,
+    ATTR_PULSE_WIDTH,
+    ATTR_TYPE,
     ATTR_VALUE,
     ATTR_VALUE_HOUR,
     ATTR_VALUE_MINUTE,
     ATTR_VALUE_SECOND,
+    ATTR_VALUES,
+    DEFAULT_PULSE_WIDTH,
     DOMAIN,
+    IHC_CLIENT,
     IHC_CONTROLLER,
     IHC_CONTROLLER_ID,
+    IHC_PROJECT_CACHE,
+    IHC_VALUE_CACHE,
+    SERVICE_GET_RUNTIME_VALUE,
     SERVICE_PULSE,
+    SERVICE_REFRESH_PROJECT,
     SERVICE_SET_RUNTIME_VALUE_BOOL,
     SERVICE_SET_RUNTIME_VALUE_FLOAT,
     SERVICE_SET_RUNTIME_VALUE_INT,
     SERVICE_SET_RUNTIME_VALUE_TIME,
     SERVICE_SET_RUNTIME_VALUE_TIMER,
+    SERVICE_SET_RUNTIME_VALUES,
+    VALUE_TYPE_BOOL,
+    VALUE_TYPE_FLOAT,
+    VALUE_TYPE_INT,
+    VALUE_TYPE_TIME,
+    VALUE_TYPE_TIMER,
+)
+from .util import (
+    async_pulse,
+    async_set_bool,
+    async_set_float,
+    async_set_int,
+    async_set_time,
+    async_set_timer,
+    async_set_value,
 )
-from .util import async_pulse, async_set_bool, async_set_float, async_set_int
 
 SET_RUNTIME_VALUE_BOOL_SCHEMA = vol.Schema(
     {
@@ -51,6 +84,9 @@ SET_RUNTIME_VALUE_FLOAT_SCHEMA = vol.Schema(
 PULSE_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_IHC_ID): cv.positive_int,
+        vol.Optional(ATTR_PULSE_WIDTH, default=DEFAULT_PULSE_WIDTH): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=10)
+        ),
         vol.Optional(ATTR_CONTROLLER_ID, default=""): cv.string,
     }
 )
@@ -63,6 +99,66 @@ SET_RUNTIME_VALUE_TIMER_SCHEMA = vol.Schema(
     }
 )
 
+
+def validate_time_value(value: Any) -> tuple[int, int, int]:
+    """Validate a time value and return (hours, minutes, seconds)."""
+    time_value = cv.time(value)
+    return (time_value.hour, time_value.minute, time_value.second)
+
+
+RUNTIME_VALUE_VALIDATORS = {
+    VALUE_TYPE_BOOL: cv.boolean,
+    VALUE_TYPE_INT: vol.Coerce(int),
+    VALUE_TYPE_FLOAT: vol.Coerce(float),
+    VALUE_TYPE_TIMER: vol.Coerce(int),
+    VALUE_TYPE_TIME: validate_time_value,
+}
+
+
+def validate_runtime_value(item: dict[str, Any]) -> dict[str, Any]:
+    """Validate the value of a runtime value item according to its type."""
+    validator = RUNTIME_VALUE_VALIDATORS[item[ATTR_TYPE]]
+    try:
+        item[ATTR_VALUE] = validator(item[ATTR_VALUE])
+    except (vol.Invalid, ValueError) as exp:
+        msg = f"Invalid {item[ATTR_TYPE]} value for IHC id {item[ATTR_IHC_ID]}"
+        raise vol.Invalid(msg) from exp
+    return item
+
+
+SET_RUNTIME_VALUES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_VALUES): vol.All(
+            cv.ensure_list,
+            [
+                vol.All(
+                    {
+                        vol.Required(ATTR_IHC_ID): cv.positive_int,
+                        vol.Required(ATTR_TYPE): vol.In(RUNTIME_VALUE_VALIDATORS),
+                        vol.Required(ATTR_VALUE): vol.Any(bool, int, float, cv.string),
+                        vol.Optional(ATTR_CONTROLLER_ID): cv.string,
+                    },
+                    validate_runtime_value,
+                )
+            ],
+        ),
+        vol.Optional(ATTR_CONTROLLER_ID, default=""): cv.string,
+    }
+)
+
+GET_RUNTIME_VALUE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_IHC_ID): cv.positive_int,
+        vol.Optional(ATTR_CONTROLLER_ID, default=""): cv.string,
+    }
+)
+
+REFRESH_PROJECT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONTROLLER_ID, default=""): cv.string,
+    }
+)
+
 SET_RUNTIME_VALUE_TIME_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_IHC_ID): cv.positive_int,
@@ -82,18 +178,29 @@ SET_RUNTIME_VALUE_TIME_SCHEMA = vol.Schema(
 )
 
 
-def setup_service_functions(hass: HomeAssistant) -> None:
+def get_response_value(value: Any) -> Any:
+    """Get a runtime value that can be used in a service response."""
+    if isinstance(value, (datetime.time, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def setup_service_functions(hass: HomeAssistant) -> None:  # noqa: PLR0915
     """Set up the IHC service functions."""
 
-    def _get_controller(call: ServiceCall) -> IHCController:
-        controller_id = call.data[ATTR_CONTROLLER_ID]
+    def _get_entry_id(call: ServiceCall) -> str:
+        return _find_entry_id(call.data[ATTR_CONTROLLER_ID])
+
+    def _find_entry_id(controller_id: str) -> str:
         if controller_id != "":
-            for data in hass.data[DOMAIN].values():
+            for entry_id, data in hass.data[DOMAIN].items():
                 if data[IHC_CONTROLLER_ID] == controller_id:
-                    return data[IHC_CONTROLLER]
+                    return entry_id
         # if the controller id was not found or specified we use the first one
-        entry_id = next(iter(hass.data[DOMAIN]))
-        return hass.data[DOMAIN][entry_id][IHC_CONTROLLER]
+        return next(iter(hass.data[DOMAIN]))
+
+    def _get_controller(call: ServiceCall) -> IHCController:
+        return hass.data[DOMAIN][_get_entry_id(call)][IHC_CONTROLLER]
 
     async def async_set_runtime_value_bool(call: ServiceCall) -> None:
         """Set a IHC runtime bool value service function."""
@@ -120,16 +227,15 @@ def setup_service_functions(hass: HomeAssistant) -> None:
         """Pulse a IHC controller input function."""
         ihc_id = call.data[ATTR_IHC_ID]
         ihc_controller = _get_controller(call)
-        await async_pulse(hass, ihc_controller, ihc_id)
+        # The pulse is sent in the background
+        async_pulse(hass, ihc_controller, ihc_id, call.data[ATTR_PULSE_WIDTH])
 
     async def async_set_runtime_value_timer(call: ServiceCall) -> None:
         """Set a IHC runtime integer value service function."""
         ihc_id = call.data[ATTR_IHC_ID]
         value = call.data[ATTR_VALUE]
         ihc_controller = _get_controller(call)
-        await hass.async_add_executor_job(
-            ihc_controller.set_runtime_value_timer, ihc_id, value
-        )
+        await async_set_timer(hass, ihc_controller, ihc_id, value)
 
     async def async_set_runtime_value_time(call: ServiceCall) -> None:
         """Set a IHC runtime integer value service function."""
@@ -138,14 +244,80 @@ def setup_service_functions(hass: HomeAssistant) -> None:
         value_minute = call.data[ATTR_VALUE_MINUTE]
         value_second = call.data[ATTR_VALUE_SECOND]
         ihc_controller = _get_controller(call)
-        await hass.async_add_executor_job(
-            ihc_controller.set_runtime_value_time,
-            ihc_id,
-            value_hour,
-            value_minute,
-            value_second,
+        await async_set_time(
+            hass, ihc_controller, ihc_id, (value_hour, value_minute, value_second)
         )
 
+    async def async_set_runtime_values(call: ServiceCall) -> ServiceResponse:
+        """
+        Set multiple IHC runtime values service function.
+
+        The values are batched per controller, and the result of each value
+        is returned in the service response. The values are written with low
+        priority, so entity commands are not delayed by bulk writes.
+        """
+        default_controller_id = call.data[ATTR_CONTROLLER_ID]
+        controller_ids = []
+        writes = []
+        for item in call.data[ATTR_VALUES]:
+            controller_id = item.get(ATTR_CONTROLLER_ID, default_controller_id)
+            controller_data = hass.data[DOMAIN][_find_entry_id(controller_id)]
+            controller_ids.append(controller_data[IHC_CONTROLLER_ID])
+            writes.append(
+                async_set_value(
+                    hass,
+                    controller_data[IHC_CONTROLLER],
+                    item[ATTR_IHC_ID],
+                    item[ATTR_TYPE],
+                    item[ATTR_VALUE],
+                    PRIORITY_LOW,
+                )
+            )
+        results = await asyncio.gather(*writes, return_exceptions=True)
+        return {
+            "results": [
+                {
+                    ATTR_IHC_ID: item[ATTR_IHC_ID],
+                    ATTR_CONTROLLER_ID: controller_id,
+                    "success": result is True,
+                }
+                for item, controller_id, result in zip(
+                    call.data[ATTR_VALUES], controller_ids, results, strict=True
+                )
+            ]
+        }
+
+    async def async_get_runtime_value(call: ServiceCall) -> ServiceResponse:
+        """
+        Get a IHC runtime value service function.
+
+        The value is read from the value cache, and read from the controller
+        if the cached value was not confirmed recently. If the read fails, the
+        cached value is returned with the time it was set.
+        """
+        ihc_id = call.data[ATTR_IHC_ID]
+        controller_data = hass.data[DOMAIN][_get_entry_id(call)]
+        value_cache = controller_data[IHC_VALUE_CACHE]
+        if value_cache.get_confirmed(ihc_id) is None:
+            client = controller_data[IHC_CLIENT]
+            values = await client.async_get_runtime_values([ihc_id])
+            if values and ihc_id in values:
+                value_cache.set(ihc_id, values[ihc_id])
+        cached = value_cache.get(ihc_id)
+        return {
+            ATTR_IHC_ID: ihc_id,
+            ATTR_CONTROLLER_ID: controller_data[IHC_CONTROLLER_ID],
+            ATTR_VALUE: get_response_value(cached.value) if cached else None,
+            "updated": cached.updated.isoformat() if cached else None,
+        }
+
+    async def async_refresh_project(call: ServiceCall) -> None:
+        """Clear the cached IHC project and reload the controller."""
+        entry_id = _get_entry_id(call)
+        project_cache = hass.data[DOMAIN][entry_id][IHC_PROJECT_CACHE]
+        await hass.async_add_executor_job(project_cache.clear)
+        await hass.config_entries.async_reload(entry_id)
+
     hass.services.async_register(
         DOMAIN,
         SERVICE_SET_RUNTIME_VALUE_BOOL,
@@ -179,3 +351,23 @@ def setup_service_functions(hass: HomeAssistant) -> None:
         async_set_runtime_value_time,
         schema=SET_RUNTIME_VALUE_TIME_SCHEMA,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_PROJECT,
+        async_refresh_project,
+        schema=REFRESH_PROJECT_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_RUNTIME_VALUES,
+        async_set_runtime_values,
+        schema=SET_RUNTIME_VALUES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_RUNTIME_VALUE,
+        async_get_runtime_value,
+        schema=GET_RUNTIME_VALUE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
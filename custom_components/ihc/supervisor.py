@@ -0,0 +1,92 @@
+"""Supervise the connection to the IHC controller."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util import dt as dt_util
+
+from .aioclient import IHCAsyncClient
+from .const import SIGNAL_AVAILABILITY
+from .metrics import OPERATION_RECONNECT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between reconnect attempts, doubled after each failed attempt
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+# Number of reconnects kept in the history
+HISTORY_SIZE = 20
+
+
+class IHCConnectionSupervisor:
+    """
+    Track the connection to a controller, and reconnect when it is lost.
+
+    The notification long poll is the health probe, it returns at least
+    every NOTIFY_WAIT seconds while the controller is alive. When it fails,
+    async_reconnect authenticates again with exponential backoff, and has
+    the caller resync the resource values before the controller is used
+    again. The controller is only unavailable if the first attempt fails, so
+    a single lost request does not make the entities flicker. Each reconnect
+    is recorded in the metrics, with the downtime as the latency.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, client: IHCAsyncClient, controller_id: str
+    ) -> None:
+        """Initialize the supervisor."""
+        self.hass = hass
+        self.client = client
+        self.controller_id = controller_id
+        self.signal = SIGNAL_AVAILABILITY.format(controller_id)
+        self.available = True
+        self.reconnects = 0
+        # Total seconds without a connection
+        self.downtime = 0.0
+        # The time and downtime of the last reconnects, and if the entities
+        # were unavailable
+        self.history: deque[dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+
+    async def async_reconnect(self, resync: Callable[[], Awaitable[bool]]) -> None:
+        """Authenticate and resync until both succeed."""
+        start = time.monotonic()
+        delay = RECONNECT_MIN_DELAY
+        while not (await self.client.async_authenticate() and await resync()):
+            if self.available:
+                _LOGGER.warning(
+                    "Lost the connection to IHC controller %s", self.controller_id
+                )
+                self._async_set_available(available=False)
+            _LOGGER.debug("IHC reconnect failed, retrying in %d seconds", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        downtime = time.monotonic() - start
+        self.reconnects += 1
+        self.downtime += downtime
+        self.history.append(
+            {
+                "time": dt_util.utcnow().isoformat(),
+                "downtime": round(downtime, 3),
+                "unavailable": not self.available,
+            }
+        )
+        self.client.metrics.record(OPERATION_RECONNECT, downtime)
+        if not self.available:
+            _LOGGER.warning(
+                "Reconnected to IHC controller %s after %.0f seconds",
+                self.controller_id,
+                downtime,
+            )
+            self._async_set_available(available=True)
+
+    @callback
+    def _async_set_available(self, *, available: bool) -> None:
+        """Set the availability, and tell the entities."""
+        self.available = available
+        async_dispatcher_send(self.hass, self.signal)
@@ -9,8 +9,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from ihcsdk.ihccontroller import IHCController
 
-from .const import CONF_OFF_ID, CONF_ON_ID, DOMAIN, IHC_CONTROLLER
+from .const import CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC, DOMAIN, IHC_CONTROLLER
 from .ihcdevice import IHCDevice
+from .resource import IHCResource
 from .util import async_pulse, async_set_bool
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,28 +23,14 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Load IHC switches based on a config entry."""
-    controller_id: str = str(entry.unique_id)
     controller_data = hass.data[DOMAIN][entry.entry_id]
     ihc_controller: IHCController = controller_data[IHC_CONTROLLER]
-    switches = []
+    optimistic = entry.options.get(CONF_OPTIMISTIC, DEFAULT_OPTIMISTIC)
     if controller_data.get("switch"):
-        for name, device in controller_data["switch"].items():
-            ihc_id = device["ihc_id"]
-            product_cfg = device["product_cfg"]
-            product = device["product"]
-            ihc_off_id = product_cfg.get(CONF_OFF_ID)
-            ihc_on_id = product_cfg.get(CONF_ON_ID)
-            switch = IHCSwitch(
-                ihc_controller,
-                controller_id,
-                name,
-                ihc_id,
-                ihc_off_id,
-                ihc_on_id,
-                product,
-            )
-            switches.append(switch)
-        async_add_entities(switches)
+        async_add_entities(
+            IHCSwitch(ihc_controller, name, resource, optimistic=optimistic)
+            for name, resource in controller_data["switch"].items()
+        )
 
 
 class IHCSwitch(IHCDevice, SwitchEntity):
@@ -52,37 +39,51 @@ class IHCSwitch(IHCDevice, SwitchEntity):
     def __init__(
         self,
         ihc_controller: IHCController,
-        controller_id: str,
         name: str,
-        ihc_id: int,
-        ihc_off_id: int,
-        ihc_on_id: int,
-        product=None,
+        resource: IHCResource,
+        *,
+        optimistic: bool = False,
     ) -> None:
         """Initialize the IHC switch."""
-        super().__init__(ihc_controller, controller_id, name, ihc_id, product)
-        self._ihc_off_id = ihc_off_id
-        self._ihc_on_id = ihc_on_id
+        super().__init__(ihc_controller, name, resource)
+        self.optimistic = optimistic
+        self._ihc_off_id = resource.off_id
+        self._ihc_on_id = resource.on_id
 
     async def async_turn_on(self, **_kwargs: Any) -> None:
         """Turn the switch on."""
         if self._ihc_on_id:
-            await async_pulse(self.hass, self.ihc_controller, self._ihc_on_id)
+            self.async_set_optimistic(True)  # noqa: FBT003
+            async_pulse(
+                self.hass,
+                self.ihc_controller,
+                self._ihc_on_id,
+                self.resource.pulse_width,
+            )
         else:
-            await async_set_bool(
+            self.async_set_optimistic(True)  # noqa: FBT003
+            if not await async_set_bool(
                 self.hass, self.ihc_controller, self.ihc_id, value=True
-            )
+            ):
+                self.async_rollback()
 
     async def async_turn_off(self, **_kwargs: Any) -> None:
         """Turn the device off."""
         if self._ihc_off_id:
-            await async_pulse(self.hass, self.ihc_controller, self._ihc_off_id)
+            self.async_set_optimistic(False)  # noqa: FBT003
+            async_pulse(
+                self.hass,
+                self.ihc_controller,
+                self._ihc_off_id,
+                self.resource.pulse_width,
+            )
         else:
-            await async_set_bool(
+            self.async_set_optimistic(False)  # noqa: FBT003
+            if not await async_set_bool(
                 self.hass, self.ihc_controller, self.ihc_id, value=False
-            )
+            ):
+                self.async_rollback()
 
     def on_ihc_change(self, _ihc_id: int, value: Any) -> None:
         """Handle IHC resource change."""
         self._attr_is_on = value
-        self.schedule_update_ha_state()
@@ -0,0 +1,155 @@
+"""Fade the level of IHC dimmer resources."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import partial
+
+from homeassistant.core import HomeAssistant, callback
+
+from .batcher import IHCWriteBatcher
+from .const import TRANSITION_STEP_INTERVAL, VALUE_TYPE_INT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Transition:
+    """A transition in progress."""
+
+    start_level: int
+    target_level: int
+    start_time: float
+    duration: float
+    future: asyncio.Future[bool]
+    # The last level written, and the write in flight
+    level: int
+    write: asyncio.Future[bool] | None = None
+
+    def level_at(self, now: float) -> int:
+        """Return the level of the transition at a time."""
+        fraction = min(1.0, (now - self.start_time) / self.duration)
+        return round(
+            self.start_level + (self.target_level - self.start_level) * fraction
+        )
+
+
+class IHCTransitionEngine:
+    """
+    Fade the level of the dimmer resources of a controller.
+
+    All transitions of a controller are stepped by a single loop timer, every
+    TRANSITION_STEP_INTERVAL seconds. The levels of a step are queued on the
+    write batcher at the same time, so they are sent in one request no
+    matter how many lights are fading. A resource gets no new level until
+    its previous write is done, so a slow controller gets fewer steps instead
+    of a growing queue. A new transition or a cancel replaces the transition
+    in progress for the resource, and a new transition continues from the
+    level it had reached.
+    """
+
+    def __init__(self, hass: HomeAssistant, batcher: IHCWriteBatcher) -> None:
+        """Initialize the transition engine."""
+        self.hass = hass
+        self.batcher = batcher
+        self.transitions = 0
+        self.steps = 0
+        self._transitions: dict[int, _Transition] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_transition(
+        self, ihc_id: int, start_level: int, target_level: int, duration: float
+    ) -> asyncio.Future[bool]:
+        """Start a transition, the future has the result of the final write."""
+        if (previous := self._transitions.pop(ihc_id, None)) is not None:
+            start_level = previous.level
+            previous.future.cancel()
+        self.transitions += 1
+        future = self.hass.loop.create_future()
+        if duration <= 0 or start_level == target_level:
+            self._async_chain(
+                future, self.batcher.async_write(ihc_id, VALUE_TYPE_INT, target_level)
+            )
+            return future
+        self._transitions[ihc_id] = _Transition(
+            start_level, target_level, time.monotonic(), duration, future, start_level
+        )
+        if self._timer is None:
+            self._timer = self.hass.loop.call_later(
+                TRANSITION_STEP_INTERVAL, self._async_step
+            )
+        return future
+
+    @callback
+    def async_cancel(self, ihc_id: int) -> None:
+        """Stop the transition of a resource at the level it has reached."""
+        if (transition := self._transitions.pop(ihc_id, None)) is not None:
+            transition.future.cancel()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the transitions in progress."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for transition in self._transitions.values():
+            transition.future.cancel()
+        self._transitions.clear()
+
+    @callback
+    def _async_step(self) -> None:
+        """Queue the next level of all transitions."""
+        self._timer = None
+        now = time.monotonic()
+        for ihc_id, transition in list(self._transitions.items()):
+            if transition.write is not None and not transition.write.done():
+                continue
+            level = transition.level_at(now)
+            if level != transition.level:
+                transition.level = level
+                transition.write = self.batcher.async_write(
+                    ihc_id, VALUE_TYPE_INT, level
+                )
+                transition.write.add_done_callback(
+                    partial(self._async_step_done, ihc_id)
+                )
+                self.steps += 1
+            if level == transition.target_level:
+                del self._transitions[ihc_id]
+                if transition.write is None:
+                    transition.future.set_result(True)
+                else:
+                    self._async_chain(transition.future, transition.write)
+        if self._transitions:
+            self._timer = self.hass.loop.call_later(
+                TRANSITION_STEP_INTERVAL, self._async_step
+            )
+
+    @staticmethod
+    @callback
+    def _async_step_done(ihc_id: int, write: asyncio.Future[bool]) -> None:
+        """Log a failed step, the transition goes on with the next level."""
+        if not write.cancelled() and write.exception() is not None:
+            _LOGGER.debug("Unable to set the level of IHC resource %d", ihc_id)
+
+    @callback
+    def _async_chain(
+        self, future: asyncio.Future[bool], write: asyncio.Future[bool]
+    ) -> None:
+        """Set the result of a transition when its final write is done."""
+        write.add_done_callback(partial(self._async_write_done, future))
+
+    @staticmethod
+    @callback
+    def _async_write_done(
+        future: asyncio.Future[bool], write: asyncio.Future[bool]
+    ) -> None:
+        """Copy the result of the final write to the transition future."""
+        result = not write.cancelled() and write.exception() is None and write.result()
+        if future.done():
+            return
+        if not result:
+            _LOGGER.warning("Unable to complete the IHC light transition")
+        future.set_result(result)
@@ -1,18 +1,141 @@
 """Useful functions for the IHC component."""
 
 import asyncio
+from typing import Any
 
 from homeassistant.core import HomeAssistant, callback
 from ihcsdk.ihccontroller import IHCController
 
+from .batcher import PRIORITY_HIGH, set_runtime_value
+from .const import (
+    DEFAULT_PULSE_WIDTH,
+    DOMAIN,
+    IHC_CONTROLLER,
+    IHC_PULSE_ENGINE,
+    IHC_TRANSITION_ENGINE,
+    IHC_VALUE_CACHE,
+    IHC_WRITE_BATCHER,
+    VALUE_TYPE_BOOL,
+    VALUE_TYPE_FLOAT,
+    VALUE_TYPE_INT,
+    VALUE_TYPE_TIME,
+    VALUE_TYPE_TIMER,
+)
 
-async def async_pulse(
+
+@callback
+def async_pulse(
+    hass: HomeAssistant,
+    ihc_controller: IHCController,
+    ihc_id: int,
+    width: float = DEFAULT_PULSE_WIDTH,
+) -> asyncio.Future[bool]:
+    """
+    Send a short on/off pulse to an IHC controller resource.
+
+    The pulse is sent in the background, the future has the result.
+    """
+    controller_data = async_get_controller_data(hass, ihc_controller)
+    if controller_data is not None and IHC_PULSE_ENGINE in controller_data:
+        return controller_data[IHC_PULSE_ENGINE].async_pulse(ihc_id, width)
+    return hass.async_create_task(_async_pulse(hass, ihc_controller, ihc_id, width))
+
+
+async def _async_pulse(
+    hass: HomeAssistant, ihc_controller: IHCController, ihc_id: int, width: float
+) -> bool:
+    """Send a pulse with two writes, without the pulse engine."""
+    on_result = await async_set_bool(hass, ihc_controller, ihc_id, value=True)
+    await asyncio.sleep(width)
+    return await async_set_bool(hass, ihc_controller, ihc_id, value=False) and on_result
+
+
+@callback
+def async_transition(  # noqa: PLR0913
+    hass: HomeAssistant,
+    ihc_controller: IHCController,
+    ihc_id: int,
+    start_level: int,
+    target_level: int,
+    duration: float,
+) -> asyncio.Future[bool]:
+    """
+    Fade a dimmer resource from one level to another.
+
+    The transition runs in the background, the future has the result.
+    """
+    controller_data = async_get_controller_data(hass, ihc_controller)
+    if controller_data is not None and IHC_TRANSITION_ENGINE in controller_data:
+        return controller_data[IHC_TRANSITION_ENGINE].async_transition(
+            ihc_id, start_level, target_level, duration
+        )
+    return async_set_int(hass, ihc_controller, ihc_id, target_level)
+
+
+@callback
+def async_cancel_transition(
     hass: HomeAssistant, ihc_controller: IHCController, ihc_id: int
 ) -> None:
-    """Send a short on/off pulse to an IHC controller resource."""
-    await async_set_bool(hass, ihc_controller, ihc_id, value=True)
-    await asyncio.sleep(0.1)
-    await async_set_bool(hass, ihc_controller, ihc_id, value=False)
+    """Stop the transition of a dimmer resource, if there is one."""
+    controller_data = async_get_controller_data(hass, ihc_controller)
+    if controller_data is not None and IHC_TRANSITION_ENGINE in controller_data:
+        controller_data[IHC_TRANSITION_ENGINE].async_cancel(ihc_id)
+
+
+@callback
+def async_get_controller_data(
+    hass: HomeAssistant, ihc_controller: IHCController
+) -> dict[str, Any] | None:
+    """Get the hass.data dictionary for a controller."""
+    for controller_data in hass.data.get(DOMAIN, {}).values():
+        if controller_data[IHC_CONTROLLER] is ihc_controller:
+            return controller_data
+    return None
+
+
+@callback
+def async_set_value(  # noqa: PLR0913
+    hass: HomeAssistant,
+    ihc_controller: IHCController,
+    ihc_id: int,
+    value_type: str,
+    value: Any,
+    priority: int = PRIORITY_HIGH,
+) -> asyncio.Future[bool]:
+    """
+    Set a runtime value on an IHC controller resource.
+
+    The write is batched with other writes to the same controller, and the
+    value cache is updated when the write succeeds. If enabled, writing a
+    value the controller has confirmed recently is skipped, unless another
+    write to the resource is still queued or in flight.
+    """
+    controller_data = async_get_controller_data(hass, ihc_controller)
+    if controller_data is not None and IHC_WRITE_BATCHER in controller_data:
+        batcher = controller_data[IHC_WRITE_BATCHER]
+        value_cache = controller_data[IHC_VALUE_CACHE]
+        if not batcher.has_pending_write(ihc_id) and value_cache.should_skip_write(
+            ihc_id, value
+        ):
+            future: asyncio.Future[bool] = hass.loop.create_future()
+            future.set_result(True)
+            return future
+        future = batcher.async_write(ihc_id, value_type, value, priority)
+
+        @callback
+        def _async_write_done(future: asyncio.Future[bool]) -> None:
+            if (
+                not future.cancelled()
+                and future.exception() is None
+                and future.result()
+            ):
+                value_cache.set(ihc_id, value)
+
+        future.add_done_callback(_async_write_done)
+        return future
+    return hass.async_add_executor_job(
+        set_runtime_value, ihc_controller, ihc_id, value_type, value
+    )
 
 
 @callback
@@ -20,9 +143,7 @@ def async_set_bool(
     hass: HomeAssistant, ihc_controller: IHCController, ihc_id: int, value: bool
 ) -> asyncio.Future[bool]:
     """Set a bool value on an IHC controller resource."""
-    return hass.async_add_executor_job(
-        ihc_controller.set_runtime_value_bool, ihc_id, value
-    )
+    return async_set_value(hass, ihc_controller, ihc_id, VALUE_TYPE_BOOL, value)
 
 
 @callback
@@ -30,9 +151,7 @@ def async_set_int(
     hass: HomeAssistant, ihc_controller: IHCController, ihc_id: int, value: int
 ) -> asyncio.Future[bool]:
     """Set a int value on an IHC controller resource."""
-    return hass.async_add_executor_job(
-        ihc_controller.set_runtime_value_int, ihc_id, value
-    )
+    return async_set_value(hass, ihc_controller, ihc_id, VALUE_TYPE_INT, value)
 
 
 @callback
@@ -40,9 +159,26 @@ def async_set_float(
     hass: HomeAssistant, ihc_controller: IHCController, ihc_id: int, value: float
 ) -> asyncio.Future[bool]:
     """Set a float value on an IHC controller resource."""
-    return hass.async_add_executor_job(
-        ihc_controller.set_runtime_value_float, ihc_id, value
-    )
+    return async_set_value(hass, ihc_controller, ihc_id, VALUE_TYPE_FLOAT, value)
+
+
+@callback
+def async_set_timer(
+    hass: HomeAssistant, ihc_controller: IHCController, ihc_id: int, value: int
+) -> asyncio.Future[bool]:
+    """Set a timer value in milliseconds on an IHC controller resource."""
+    return async_set_value(hass, ihc_controller, ihc_id, VALUE_TYPE_TIMER, value)
+
+
+@callback
+def async_set_time(
+    hass: HomeAssistant,
+    ihc_controller: IHCController,
+    ihc_id: int,
+    value: tuple[int, int, int],
+) -> asyncio.Future[bool]:
+    """Set a time value (hours, minutes, seconds) on an IHC controller resource."""
+    return async_set_value(hass, ihc_controller, ihc_id, VALUE_TYPE_TIME, value)
 
 
 def get_controller_serial(ihc_controller: IHCController) -> str:
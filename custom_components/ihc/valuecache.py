@@ -0,0 +1,94 @@
+"""Cache of the last known IHC resource values."""
+
+import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+# Seconds a confirmed value is trusted, for skipping an unchanged write and
+# for the ihc.get_runtime_value service
+CONFIRMED_MAX_AGE = 60
+
+
+class CachedValue(NamedTuple):
+    """
+    A resource value and the time it was last set.
+
+    The value is confirmed when it came from a notification or the initial
+    value read, and the controller keeps it up to date.
+    """
+
+    value: Any
+    updated: datetime.datetime
+    confirmed: bool = True
+
+
+def normalize_value(value: Any) -> Any:
+    """Get a written value the way the controller reports it."""
+    if isinstance(value, tuple):
+        # Time values are written as (hours, minutes, seconds)
+        return datetime.time(*value)
+    return value
+
+
+class IHCValueCache:
+    """
+    Write-through cache of the resource values of a controller.
+
+    The cache is fed by notifications, the initial value reads and successful
+    writes. When skip_unchanged_writes is set, writing a value that was
+    confirmed recently is skipped. A written value is not confirmed, as the
+    controller program may change a resource without notifying us.
+    """
+
+    def __init__(self, *, skip_unchanged_writes: bool = False) -> None:
+        """Initialize the value cache."""
+        self.skip_unchanged_writes = skip_unchanged_writes
+        self.skipped_writes = 0
+        self._values: dict[int, CachedValue] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached values."""
+        return len(self._values)
+
+    @callback
+    def get(self, ihc_id: int) -> CachedValue | None:
+        """Get the cached value of a resource."""
+        return self._values.get(ihc_id)
+
+    @callback
+    def set(self, ihc_id: int, value: Any) -> None:
+        """Set a value written to, or read once from, a resource."""
+        self._values[ihc_id] = CachedValue(
+            normalize_value(value), dt_util.utcnow(), confirmed=False
+        )
+
+    @callback
+    def update(self, values: dict[int, Any]) -> None:
+        """Set the values of several resources, as notified by the controller."""
+        now = dt_util.utcnow()
+        for ihc_id, value in values.items():
+            self._values[ihc_id] = CachedValue(normalize_value(value), now)
+
+    @callback
+    def get_confirmed(self, ihc_id: int) -> CachedValue | None:
+        """Get the cached value of a resource, if it was confirmed recently."""
+        cached = self._values.get(ihc_id)
+        if cached is None or not cached.confirmed:
+            return None
+        age = (dt_util.utcnow() - cached.updated).total_seconds()
+        if age > CONFIRMED_MAX_AGE:
+            return None
+        return cached
+
+    @callback
+    def should_skip_write(self, ihc_id: int, value: Any) -> bool:
+        """Return True if the write can be skipped, because nothing changes."""
+        if not self.skip_unchanged_writes:
+            return False
+        cached = self.get_confirmed(ihc_id)
+        if cached is None or cached.value != normalize_value(value):
+            return False
+        self.skipped_writes += 1
+        return True